@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class DynamicformsConfig(AppConfig):
     name = 'dynamicforms'
+
+    def ready(self):
+        from .pagination import check_keyset_indexes
+        checks.register(check_keyset_indexes, checks.Tags.models)
@@ -0,0 +1,452 @@
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.test.signals import setting_changed
+from django.utils.translation import get_language
+
+from . import settings
+
+_templates_cacheable = None
+
+
+def templates_cacheable() -> bool:
+    """
+    Whether resolved templates (and HTML rendered from them without request data) may be kept in memory. They may not
+    when templates are reloaded as they change: when template debugging is on or a Django template engine doesn't use
+    the cached template loader
+
+    :return: True if templates are not reloaded
+    """
+    global _templates_cacheable
+    if _templates_cacheable is None:
+        from django.template import engines
+        from django.template.loaders.cached import Loader as CachedLoader
+
+        # Only Django template engines are checked: backend.engine is None for others
+        _templates_cacheable = all(
+            not engine.debug and all(isinstance(loader, CachedLoader) for loader in engine.template_loaders)
+            for engine in (getattr(backend, 'engine', None) for backend in engines.all()) if engine is not None
+        )
+    return _templates_cacheable
+
+
+# noinspection PyUnusedLocal
+def _reset_templates_cacheable(setting, **kwargs):
+    global _templates_cacheable
+    if setting in ('TEMPLATES', 'DEBUG'):
+        _templates_cacheable = None
+
+
+setting_changed.connect(_reset_templates_cacheable, dispatch_uid='dynamicforms-reset-templates-cacheable')
+
+_row_cache_stats = Counter()
+
+
+def row_cache_stats(serializer_class) -> Dict[str, int]:
+    """
+    Returns row fragment cache statistics for given serializer class (for this process only)
+
+    :param serializer_class: Serializer class
+    :return: dict(hits=int, misses=int)
+    """
+    return dict(hits=_row_cache_stats[serializer_class, 'hits'], misses=_row_cache_stats[serializer_class, 'misses'])
+
+
+def _class_key(cls) -> str:
+    return '%s.%s' % (cls.__module__, cls.__qualname__)
+
+
+def _row_version_key(model, pk) -> str:
+    return 'dynamicforms:rowver:%s:%s' % (model._meta.label_lower, pk)
+
+
+# noinspection PyUnusedLocal
+def _invalidate_row(sender, instance, **kwargs):
+    caches[settings.ROW_CACHE].set(_row_version_key(sender, instance.pk), uuid4().hex, None)
+
+
+class RowCache(object):
+    """
+    Cache of rendered table rows for a serializer class.
+
+    Rows are keyed by serializer class, view, record pk, record version and active language. View identifies the
+    viewset rendering the rows (e.g. its url_reverse and URL): rows contain its action URLs, so viewsets using the same
+    serializer don't share them. Record version is a random token stored in the cache as well. It is replaced whenever
+    the record is saved or deleted, so fragments rendered for the previous version of the record are never returned
+    again.
+
+    Use by declaring `row_cache = True` on a ModelSerializer that also uses row renderer (`use_row_renderer = True`).
+    The cache used is specified by DYNAMICFORMS_ROW_CACHE setting.
+    """
+
+    def __init__(self, serializer_class, view: str = ''):
+        """
+        :param serializer_class: Serializer class
+        :param view: identifies the view rendering the rows
+        """
+        self.serializer_class = serializer_class
+        self.view = hashlib.sha1(view.encode('utf-8')).hexdigest()[:16]
+        self.model = serializer_class.Meta.model
+        self.cache = caches[settings.ROW_CACHE]
+        uid = 'dynamicforms-row-cache-%s' % self.model._meta.label_lower
+        post_save.connect(_invalidate_row, sender=self.model, dispatch_uid=uid)
+        post_delete.connect(_invalidate_row, sender=self.model, dispatch_uid=uid)
+        self._keys = {}
+
+    def _row_versions(self, pks):
+        version_keys = {pk: _row_version_key(self.model, pk) for pk in pks}
+        versions = self.cache.get_many(list(version_keys.values()))
+        missing = [key for key in version_keys.values() if key not in versions]
+        if missing:
+            # add, not set: a record saved in the mean time must keep the version it got when it was saved
+            for key in missing:
+                self.cache.add(key, uuid4().hex, None)
+            versions.update(self.cache.get_many(missing))
+        return {pk: versions.get(key, None) for pk, key in version_keys.items()}
+
+    def get_many(self, pks: Iterable) -> Dict:
+        """
+        Returns cached row fragments for given record pks
+
+        :param pks: record primary keys
+        :return: dict pk -> rendered row fragment for rows found in cache
+        """
+        pks = [pk for pk in pks if pk is not None]
+        versions = self._row_versions(pks)
+        class_key, language = _class_key(self.serializer_class), get_language()
+        self._keys = {
+            pk: 'dynamicforms:row:%s:%s:%s:%s:%s' % (class_key, self.view, pk, version, language)
+            for pk, version in versions.items() if version is not None
+        }
+        fragments = self.cache.get_many(list(self._keys.values()))
+        res = {pk: fragments[key] for pk, key in self._keys.items() if key in fragments}
+
+        _row_cache_stats[self.serializer_class, 'hits'] += len(res)
+        _row_cache_stats[self.serializer_class, 'misses'] += len(pks) - len(res)
+        return res
+
+    def set_many(self, fragments: Dict):
+        """
+        Stores rendered row fragments. Only rows previously requested with get_many are stored
+
+        :param fragments: dict pk -> rendered row fragment
+        """
+        self.cache.set_many({self._keys[pk]: fragment for pk, fragment in fragments.items() if pk in self._keys})
+
+
+def _model_version_key(model) -> str:
+    return 'dynamicforms:modelver:%s' % model._meta.label_lower
+
+
+_model_version_caches = {}
+
+
+# noinspection PyUnusedLocal
+def _invalidate_model(sender, **kwargs):
+    for cache_name in _model_version_caches.get(sender, ()):
+        caches[cache_name].set(_model_version_key(sender), uuid4().hex, None)
+
+
+def model_version(model, cache_name: str) -> Optional[str]:
+    """
+    Returns a random token, stored in given cache, that is replaced whenever a record of the model is saved or deleted.
+    Cache keys including it therefore stop being used once the model's data changes
+
+    :param model: Model class
+    :param cache_name: name of the django cache
+    :return: version token or None if the cache lost it (nothing must be cached then)
+    """
+    if cache_name not in _model_version_caches.get(model, ()):
+        uid = 'dynamicforms-model-version-%s' % model._meta.label_lower
+        post_save.connect(_invalidate_model, sender=model, dispatch_uid=uid)
+        post_delete.connect(_invalidate_model, sender=model, dispatch_uid=uid)
+        _model_version_caches.setdefault(model, set()).add(cache_name)
+    cache = caches[cache_name]
+    key = _model_version_key(model)
+    # add, not set: a record saved in the mean time must keep the version it got when it was saved
+    token = uuid4().hex
+    if cache.add(key, token, None):
+        return token
+    return cache.get(key)
+
+
+def estimated_count(queryset) -> Optional[int]:
+    """
+    Returns number of records in queryset's table as estimated by the database planner (SQLite: sqlite_stat1 table,
+    filled by ANALYZE, PostgreSQL: pg_class.reltuples). Only works for querysets without filters
+
+    :param queryset: Queryset
+    :return: estimated number of records or None if there is no estimate
+    """
+    query = queryset.query
+    if query.where or query.distinct or query.low_mark or query.high_mark is not None:
+        return None
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+    return None
+
+
+def record_count(queryset) -> Tuple[int, bool]:
+    """
+    Returns number of records in the queryset without counting them on every request.
+
+    Unfiltered querysets use database planner's estimate (see estimated_count) when there is one. Otherwise records are
+    counted and the count is cached (DYNAMICFORMS_COUNT_CACHE) for DYNAMICFORMS_COUNT_CACHE_TIMEOUT seconds, keyed by
+    the queryset's SQL. Cached counts of a model are dropped whenever one of its records is saved or deleted.
+
+    :param queryset: Queryset
+    :return: tuple (count, whether count is an estimate)
+    """
+    estimate = estimated_count(queryset)
+    if estimate is not None:
+        return estimate, True
+
+    model, cache = queryset.model, caches[settings.COUNT_CACHE]
+    version = model_version(model, settings.COUNT_CACHE)
+    if version is None:
+        return queryset.count(), False
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = 'dynamicforms:count:%s:%s:%s' % (
+        model._meta.label_lower, version, hashlib.sha1(repr((sql, params)).encode('utf-8')).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    return count, False
+
+
+def count_exceeds(queryset, limit: int) -> bool:
+    """
+    Returns whether the queryset has more than limit records, reading at most limit + 1 of them. Answer is cached like
+    counts of record_count are
+
+    :param queryset: Queryset
+    :param limit: number of records
+    :return: True if queryset has more than limit records
+    """
+    model, cache = queryset.model, caches[settings.COUNT_CACHE]
+    version = model_version(model, settings.COUNT_CACHE)
+    if version is None:
+        return queryset[:limit + 1].count() > limit
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = 'dynamicforms:exceeds:%s:%s:%s' % (
+        model._meta.label_lower, version, hashlib.sha1(repr((sql, params, limit)).encode('utf-8')).hexdigest()
+    )
+    res = cache.get(key)
+    if res is None:
+        res = queryset[:limit + 1].count() > limit
+        cache.set(key, res, settings.COUNT_CACHE_TIMEOUT)
+    return res
+
+
+def cached_template_context(view) -> dict:
+    """
+    Returns result of view's template_context(), cached (DYNAMICFORMS_TEMPLATE_CONTEXT_CACHE) for
+    view.template_context_timeout seconds and until a record of one of view.template_context_models changes.
+    Cached separately for each active language
+
+    :param view: ViewSet
+    :return: dict with context variables
+    """
+    cache_name = settings.TEMPLATE_CONTEXT_CACHE
+    versions = [model_version(model, cache_name) for model in view.template_context_models]
+    if None in versions:
+        return view.template_context()
+    versions = ':'.join(versions)
+    key = 'dynamicforms:tplctx:%s:%s:%s' % (
+        _class_key(type(view)), get_language(), hashlib.sha1(versions.encode('utf-8')).hexdigest()
+    )
+    cache = caches[cache_name]
+    res = cache.get(key)
+    if res is None:
+        res = view.template_context()
+        cache.set(key, res, view.template_context_timeout)
+    return res
+
+
+class ChoicesCache(object):
+    """
+    In-process cache of related fields' choices ((value, label) lists), shared by all requests and threads.
+
+    Choices are keyed by field class, queryset SQL and active language. They are dropped when a record of the queryset's
+    model is saved or deleted in this process and otherwise expire after DYNAMICFORMS_CHOICES_CACHE_TIMEOUT seconds
+    (which bounds staleness when another process changes the records). When the estimated size of stored choices
+    exceeds DYNAMICFORMS_CHOICES_CACHE_MAX_SIZE bytes, least recently used ones are evicted.
+
+    Use by declaring related fields with cache_choices=True
+    """
+
+    def __init__(self, max_size: int, timeout: Optional[float]):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (expires, model, size, choices)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(field, queryset) -> tuple:
+        sql, params = queryset.query.sql_with_params()
+        return (type(field), getattr(field, 'slug_field', None), getattr(field, 'label_field', None), get_language(),
+                queryset.db, sql, params)
+
+    def get_or_build(self, field, queryset, build: Callable[[], Mapping]) -> Mapping:
+        """
+        Returns cached choices of the field for the queryset, building and storing them if they are not cached
+
+        :param field: related field
+        :param queryset: queryset the choices are built from
+        :param build: function building the choices
+        :return: read-only mapping value -> label
+        """
+        key = self.key(field, queryset)
+        try:
+            hash(key)
+        except TypeError:
+            return MappingProxyType(build())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._entries.move_to_end(key)
+                return entry[3]
+
+        model = queryset.model
+        uid = 'dynamicforms-choices-cache-%s' % model._meta.label_lower
+        post_save.connect(_invalidate_choices, sender=model, dispatch_uid=uid)
+        post_delete.connect(_invalidate_choices, sender=model, dispatch_uid=uid)
+
+        choices = MappingProxyType(build())
+        size = sum(len(str(k)) + len(str(v)) for k, v in choices.items()) + 100 * (len(choices) + 1)
+        with self._lock:
+            self._remove(key)
+            if size <= self.max_size:
+                self._entries[key] = (None if self.timeout is None else now + self.timeout, model, size, choices)
+                self.size += size
+                while self.size > self.max_size:
+                    self._remove(next(iter(self._entries)))
+        return choices
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def invalidate(self, model=None):
+        """
+        Drops cached choices of the model (all of them when model is not given)
+        """
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if model is None or entry[1] is model]:
+                self._remove(key)
+
+
+choices_cache = ChoicesCache(settings.CHOICES_CACHE_MAX_SIZE, settings.CHOICES_CACHE_TIMEOUT)
+
+
+# noinspection PyUnusedLocal
+def _invalidate_choices(sender, **kwargs):
+    choices_cache.invalidate(sender)
+
+
+# Rendered filter rows: serializer class -> {(language, template): (expires, html)}
+_filter_rows = {}
+# model -> serializer classes whose filter rows list its records (in select options)
+_filter_row_models = {}
+_filter_rows_lock = threading.Lock()
+
+
+def filter_row_html(serializer_class, template: str, models: Iterable, render: Callable[[], str]) -> str:
+    """
+    Returns rendered filter row of serializer's table, rendering it only when it is not cached yet. Filter row doesn't
+    depend on the request, so it is rendered once per serializer class, language and template and then kept in memory.
+
+    When the filter row lists records of some models (e.g. options of related fields), it is dropped when one of
+    those records is saved or deleted and otherwise expires after DYNAMICFORMS_CHOICES_CACHE_TIMEOUT seconds (never, if
+    the setting is None), but at the latest after half of DYNAMICFORMS_OPTIONS_KEY_MAX_AGE. Nothing is cached when
+    templates are reloaded on change (see templates_cacheable).
+
+    :param serializer_class: Serializer class
+    :param template: filter row template
+    :param models: models whose records the filter row lists
+    :param render: function rendering the filter row
+    :return: rendered filter row
+    """
+    if not templates_cacheable():
+        with _filter_rows_lock:
+            return render()
+
+    key = (get_language(), template)
+    entry = _filter_rows.get(serializer_class, {}).get(key, None)
+    if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+        return entry[1]
+
+    # Rendering under the lock: filter serializer is shared, it must not be rendered by two threads at once
+    with _filter_rows_lock:
+        entry = _filter_rows.get(serializer_class, {}).get(key, None)
+        if entry is not None and (entry[0] is None or entry[0] > time.monotonic()):
+            return entry[1]
+        models = set(models)
+        for model in models:
+            uid = 'dynamicforms-filter-row-%s' % model._meta.label_lower
+            post_save.connect(_invalidate_filter_rows, sender=model, dispatch_uid=uid)
+            post_delete.connect(_invalidate_filter_rows, sender=model, dispatch_uid=uid)
+            _filter_row_models.setdefault(model, set()).add(serializer_class)
+        html = render()
+        timeout = settings.CHOICES_CACHE_TIMEOUT if models else None
+        if models and settings.OPTIONS_KEY_MAX_AGE is not None:
+            # Options URLs of related fields in the row must stay valid for a while after the row is served
+            key_timeout = settings.OPTIONS_KEY_MAX_AGE / 2
+            timeout = key_timeout if timeout is None else min(timeout, key_timeout)
+        expires = None if timeout is None else time.monotonic() + timeout
+        _filter_rows.setdefault(serializer_class, {})[key] = (expires, html)
+    return html
+
+
+# noinspection PyUnusedLocal
+def _invalidate_filter_rows(sender, **kwargs):
+    for serializer_class in _filter_row_models.get(sender, ()):
+        _filter_rows.pop(serializer_class, None)
+
+
+def clear_filter_rows():
+    """
+    Forgets all rendered filter rows
+    """
+    _filter_rows.clear()
+
+
+def records_changed(model, pks: Iterable = ()):
+    """
+    Drops everything cached about the model's records, same as saving or deleting a record does. Use after changing
+    records in a way that doesn't send post_save / post_delete signals (bulk_create, bulk_update, queryset.update,
+    queryset delete of records without cascades...)
+
+    :param model: Model class
+    :param pks: primary keys of the changed records (their cached table rows are dropped)
+    """
+    row_cache = caches[settings.ROW_CACHE]
+    row_cache.set_many({_row_version_key(model, pk): uuid4().hex for pk in pks}, None)
+    _invalidate_model(model)
+    _invalidate_choices(model)
+    _invalidate_filter_rows(model)
@@ -2,7 +2,7 @@ from uuid import UUID
 
 from rest_framework import fields, relations
 
-from .mixins import ActionMixin, RenderToTableMixin, UUIDMixIn
+from .mixins import ActionMixin, RelatedOptionsMixin, RenderToTableMixin, UUIDMixIn
 
 
 # noinspection PyRedeclaration
@@ -341,7 +341,8 @@ class StringRelatedField(UUIDMixIn, ActionMixin, RenderToTableMixin, relations.S
 
 
 # noinspection PyRedeclaration
-class PrimaryKeyRelatedField(UUIDMixIn, ActionMixin, RenderToTableMixin, relations.PrimaryKeyRelatedField):
+class PrimaryKeyRelatedField(UUIDMixIn, ActionMixin, RenderToTableMixin, RelatedOptionsMixin,
+                             relations.PrimaryKeyRelatedField):
 
     def __init__(self, read_only=False, write_only=False, required=None, default=fields.empty, initial=fields.empty,
                  source=None, label=None, help_text=None, style=None, error_messages=None, validators=None,
@@ -374,7 +375,7 @@ class HyperlinkedIdentityField(UUIDMixIn, ActionMixin, RenderToTableMixin, relat
 
 
 # noinspection PyRedeclaration
-class SlugRelatedField(UUIDMixIn, ActionMixin, RenderToTableMixin, relations.SlugRelatedField):
+class SlugRelatedField(UUIDMixIn, ActionMixin, RenderToTableMixin, RelatedOptionsMixin, relations.SlugRelatedField):
 
     def __init__(self, slug_field=None, read_only=False, write_only=False, required=None, default=fields.empty,
                  initial=fields.empty, source=None, label=None, help_text=None, style=None, error_messages=None,
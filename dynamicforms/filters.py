@@ -0,0 +1,225 @@
+from datetime import datetime, time, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import dateparse, timezone
+
+from .fulltext import TextIndex
+
+
+class Filter(NamedTuple):
+    """
+    Filter for a single query parameter
+    """
+
+    lookups: Tuple[str, ...]  #: queryset filter keywords, e.g. ('char_field__icontains', )
+    coerce: Callable[[str], Tuple]  #: converts query parameter to lookup values. Raises ValueError for invalid values
+
+
+def _identity(value):
+    return value,
+
+
+def _parse_bool(value):
+    return value == 'true',
+
+
+def _model_coerce(field):
+    def coerce(value):
+        try:
+            return field.to_python(value),
+        except ValidationError as e:
+            raise ValueError(e)
+
+    return coerce
+
+
+def _make_aware(value, is_dst: bool):
+    # is_dst resolves local times that don't exist or occur twice on DST transitions instead of raising pytz errors
+    if timezone.is_naive(value):
+        return timezone.make_aware(value, timezone.get_current_timezone(), is_dst=is_dst)
+    return value
+
+
+def _date_range(value):
+    """
+    Parses an ISO date (time) value into a half-open range of dates covering it
+
+    :param value: query parameter value
+    :return: tuple (first date, first date after the range)
+    """
+    date = dateparse.parse_date(value) or dateparse.parse_datetime(value)
+    if date is None:
+        raise ValueError('Not a date: %s' % value)
+    if isinstance(date, datetime):
+        date = date.date()
+    return date, date + timedelta(days=1)
+
+
+def _datetime_range(value):
+    """
+    Parses an ISO date (time) value into a half-open range of datetimes covering it. A date covers the whole day, a
+    time with minutes covers the whole minute, etc. Values without time zone are in the current time zone (if USE_TZ)
+
+    :param value: query parameter value
+    :return: tuple (start, end)
+    """
+    date = dateparse.parse_date(value)
+    if date is not None:
+        start = datetime.combine(date, time())
+        end = start + timedelta(days=1)
+    else:
+        match = dateparse.datetime_re.match(value)
+        start = dateparse.parse_datetime(value)
+        if start is None:
+            raise ValueError('Not a date / time: %s' % value)
+        parts = match.groupdict()
+        if parts['second'] is None:
+            end = start + timedelta(minutes=1)
+        elif parts['microsecond'] is None:
+            end = start + timedelta(seconds=1)
+        else:
+            end = start + timedelta(microseconds=1)
+    if settings.USE_TZ:
+        # Of the two occurrences of an ambiguous time, range starts at the earlier one and ends at the later one
+        return _make_aware(start, True), _make_aware(end, False)
+    return start, end
+
+
+def _fulltext_filter(field) -> Filter:
+    index = TextIndex(field.model, field.name)
+    if index.uses_index_lookup():
+        return Filter(('pk__in',), index.coerce)
+    return Filter((field.name + '__icontains',), _identity)
+
+
+TEXT_FILTERS = dict(
+    icontains=lambda field: Filter((field.name + '__icontains',), _identity),
+    prefix=lambda field: Filter((field.name + '__istartswith',), _identity),
+    exact=lambda field: Filter((field.name,), _identity),
+    fulltext=_fulltext_filter,
+)  # text filter strategy name -> function(model field) returning Filter
+
+
+def text_filter_strategy(serializer_class, field_name: str):
+    """
+    Returns text filter strategy a serializer declares for given field (see ModelSerializer.text_filter)
+
+    :param serializer_class: Serializer class or None
+    :param field_name: model field name
+    :return: strategy name (key in TEXT_FILTERS) or function(model field) returning Filter
+    """
+    strategies = getattr(serializer_class, 'text_filters', None) or {}
+    return strategies.get(field_name, getattr(serializer_class, 'text_filter', 'icontains'))
+
+
+class FilterPlan(object):
+    """
+    Filters that can be applied to queryset of a model, compiled once per (model, serializer class) pair.
+
+    Every allowed query parameter maps to a prebuilt Filter, so filtering a request costs one dict lookup per parameter.
+    Allowed parameters are names of model fields and names of serializer fields whose source is a model field (for dates
+    also with __from and __to suffixes).
+    """
+
+    _plans = {}
+
+    def __init__(self, model, serializer_class=None):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.filters = {}  # type: Dict[str, Filter]
+
+        for field in model._meta.get_fields():
+            self.filters.update(self.build_filters(field))
+
+        if serializer_class is not None:
+            for name, field in serializer_class().fields.items():
+                source_attrs = getattr(field, 'source_attrs', ())
+                if name not in self.filters and len(source_attrs) == 1 and source_attrs[0] in self.filters:
+                    source = source_attrs[0]
+                    self.filters.update({
+                        name + param[len(source):]: flt for param, flt in list(self.filters.items())
+                        if param == source or param.startswith(source + '__')
+                    })
+
+    @classmethod
+    def get(cls, model, serializer_class=None) -> 'FilterPlan':
+        """
+        Returns filter plan for given model and serializer class. Plans are compiled on first use
+
+        :param model: Model class
+        :param serializer_class: Serializer class used for the model
+        :return: FilterPlan
+        """
+        key = (model, serializer_class)
+        plan = cls._plans.get(key, None)
+        if plan is None:
+            plan = cls(model, serializer_class)
+            cls._plans[key] = plan
+        return plan
+
+    # noinspection PyMethodMayBeStatic
+    def build_filters(self, field) -> Dict[str, Filter]:
+        """
+        Builds filters for a model field. Override to change how a field type is filtered
+
+        Text fields are filtered using strategy declared on the serializer (see ModelSerializer.text_filter).
+        Date and datetime fields are filtered with half-open ranges (field >= start and field < end) so that database
+        indexes can be used. Besides the field name itself they also accept field__from and field__to parameters.
+
+        :param field: Model field (or relation)
+        :return: dict query parameter name -> Filter
+        """
+        name = field.name
+        if isinstance(field, (models.CharField, models.TextField)):
+            strategy = text_filter_strategy(self.serializer_class, name)
+            return {name: (TEXT_FILTERS[strategy] if isinstance(strategy, str) else strategy)(field)}
+        if isinstance(field, (models.DateField, models.DateTimeField)):
+            parse = _datetime_range if isinstance(field, models.DateTimeField) else _date_range
+            return {
+                name: Filter((name + '__gte', name + '__lt'), parse),
+                name + '__from': Filter((name + '__gte',), lambda value: parse(value)[:1]),
+                name + '__to': Filter((name + '__lt',), lambda value: parse(value)[1:]),
+            }
+        if isinstance(field, models.BooleanField):
+            return {name: Filter((name,), _parse_bool)}
+        if isinstance(field, models.Field):
+            return {name: Filter((name,), _model_coerce(field))}
+        return {name: Filter((name,), _identity)}
+
+    def filter(self, queryset, param: str, value: str):
+        """
+        Applies filter for a single query parameter. Unknown parameters and invalid values are ignored
+
+        :param queryset: Queryset
+        :param param: query parameter name
+        :param value: query parameter value
+        :return: queryset with applied filter
+        """
+        return self.apply(queryset, ((param, value),))[0]
+
+    def apply(self, queryset, params) -> Tuple[Any, List[str]]:
+        """
+        Applies filters for given query parameters
+
+        :param queryset: Queryset
+        :param params: iterable of (query parameter name, value) pairs
+        :return: tuple (queryset with filters applied, names of parameters that were not applied)
+        """
+        rejected = []
+        for param, value in params:
+            if value is None or value == '':
+                continue
+            flt = self.filters.get(param, None)
+            if flt is None:
+                rejected.append(param)
+                continue
+            try:
+                values = flt.coerce(value)
+            except (ValueError, TypeError):
+                rejected.append(param)
+                continue
+            queryset = queryset.filter(**dict(zip(flt.lookups, values)))
+        return queryset, rejected
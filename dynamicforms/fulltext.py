@@ -0,0 +1,108 @@
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+
+
+class _Subquery(RawSQL):
+    # pk__in lookup already puts the subquery in parentheses. Doubled, it would become a scalar subquery
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+class TextIndex(object):
+    """
+    Database index making text filtering of a model field fast. Used by 'fulltext' text filter strategy.
+
+    * SQLite: an FTS5 table with trigram tokenizer, shadowing the field. It is kept up to date by triggers on the
+      model's table. Filter values shorter than three characters fall back to a plain icontains
+    * PostgreSQL: a GIN trigram index (pg_trgm) that the icontains lookup can use
+    * Other databases: nothing, filtering is done with icontains
+
+    Indexes are created (or rebuilt) with the build_text_index management command.
+    """
+
+    def __init__(self, model, field_name: str):
+        self.model = model
+        self.field = model._meta.get_field(field_name)
+        self.table = model._meta.db_table
+        self.name = 'df_text_%s_%s' % (self.table, self.field.column)
+        self._ready = set()
+
+    @property
+    def connection(self):
+        return connections[router.db_for_read(self.model)]
+
+    def uses_index_lookup(self) -> bool:
+        """
+        Whether filtering goes through the index table (SQLite) instead of field's icontains lookup
+        """
+        return self.connection.vendor == 'sqlite'
+
+    def exists(self) -> bool:
+        connection = self.connection
+        if connection.alias in self._ready:
+            return True
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.name])
+            elif connection.vendor == 'postgresql':
+                cursor.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s', [self.name])
+            else:
+                return False
+            res = cursor.fetchone() is not None
+        if res:
+            self._ready.add(connection.alias)
+        return res
+
+    def coerce(self, value: str):
+        """
+        Filter value for 'pk__in' lookup matching records whose field contains given value
+
+        :param value: query parameter value
+        :return: tuple with one subquery
+        """
+        if len(value) < 3 or not self.exists():
+            return self.model._base_manager.filter(**{self.field.name + '__icontains': value}).values('pk'),
+        qn = self.connection.ops.quote_name
+        return _Subquery('SELECT rowid FROM %s WHERE %s MATCH %%s' % (qn(self.name), qn(self.name)),
+                          ['"%s"' % value.replace('"', '""')]),
+
+    def build(self):
+        """
+        Creates the index, dropping the existing one first
+        """
+        connection = self.connection
+        qn = connection.ops.quote_name
+        name, table, column = qn(self.name), qn(self.table), qn(self.field.column)
+        pk = qn(self.model._meta.pk.column)
+
+        if connection.vendor == 'sqlite':
+            statements = ['DROP TABLE IF EXISTS %s' % name] + [
+                'DROP TRIGGER IF EXISTS %s' % qn(self.name + suffix) for suffix in ('_ai', '_ad', '_au')
+            ] + [
+                "CREATE VIRTUAL TABLE {name} USING fts5({column}, content={table}, content_rowid={pk}, "
+                "tokenize='trigram')",
+                "INSERT INTO {name}({name}) VALUES ('rebuild')",
+                'CREATE TRIGGER {ai} AFTER INSERT ON {table} BEGIN '
+                'INSERT INTO {name}(rowid, {column}) VALUES (new.{pk}, new.{column}); END',
+                'CREATE TRIGGER {ad} AFTER DELETE ON {table} BEGIN '
+                "INSERT INTO {name}({name}, rowid, {column}) VALUES ('delete', old.{pk}, old.{column}); END",
+                'CREATE TRIGGER {au} AFTER UPDATE ON {table} BEGIN '
+                "INSERT INTO {name}({name}, rowid, {column}) VALUES ('delete', old.{pk}, old.{column}); "
+                'INSERT INTO {name}(rowid, {column}) VALUES (new.{pk}, new.{column}); END',
+            ]
+        elif connection.vendor == 'postgresql':
+            statements = [
+                'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+                'DROP INDEX IF EXISTS {name}',
+                'CREATE INDEX {name} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)',
+            ]
+        else:
+            return
+
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement.format(
+                    name=name, table=table, column=column, pk=pk,
+                    ai=qn(self.name + '_ai'), ad=qn(self.name + '_ad'), au=qn(self.name + '_au')
+                ))
+        self._ready.add(connection.alias)
@@ -0,0 +1,59 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+
+def fulltext_fields():
+    """
+    Finds model text fields that DynamicForms serializers declare to be filtered with 'fulltext' strategy
+
+    :return: set of (model, field name)
+    """
+    from dynamicforms.filters import text_filter_strategy
+    from dynamicforms.serializers import ModelSerializer
+
+    # Serializers are declared in modules the url configuration imports
+    import_module(settings.ROOT_URLCONF)
+
+    res, classes = set(), [ModelSerializer]
+    while classes:
+        cls = classes.pop()
+        classes.extend(cls.__subclasses__())
+        model = getattr(getattr(cls, 'Meta', None), 'model', None)
+        if model is None or model._meta.abstract:
+            continue
+        for field in model._meta.get_fields():
+            if isinstance(field, (models.CharField, models.TextField)) and \
+                    text_filter_strategy(cls, field.name) == 'fulltext':
+                res.add((model, field.name))
+    return res
+
+
+class Command(BaseCommand):
+    help = 'Build (or rebuild) text indexes for fields filtered with the fulltext strategy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fields', nargs='*', metavar='app_label.Model.field',
+                            help='fields to index. When not given, all fields declared as fulltext by serializers')
+
+    def handle(self, *args, **options):
+        from dynamicforms.fulltext import TextIndex
+
+        if options['fields']:
+            targets = []
+            for label in options['fields']:
+                try:
+                    app_label, model_name, field_name = label.split('.')
+                    targets.append((apps.get_model(app_label, model_name), field_name))
+                except (ValueError, LookupError):
+                    raise CommandError('Unknown field %s. Use app_label.Model.field' % label)
+        else:
+            targets = sorted(fulltext_fields(), key=lambda t: (t[0]._meta.label, t[1]))
+
+        for model, field_name in targets:
+            index = TextIndex(model, field_name)
+            index.build()
+            self.stdout.write('Built %s on %s.%s' % (index.name, model._meta.label, field_name))
@@ -1,9 +1,27 @@
+import hashlib
+import itertools
+import json
+import threading
 import uuid as uuid_module
-from typing import List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
 
+from django.core import signing
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.signals import request_started
+from django.urls import NoReverseMatch, reverse
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from rest_framework import fields, relations
 from rest_framework.serializers import Serializer
 from rest_framework.templatetags import rest_framework as drftt
 
+from . import settings
+from .cache import choices_cache, count_exceeds
+
 
 class UUIDMixIn(object):
     """
@@ -15,11 +33,96 @@ class UUIDMixIn(object):
     Similar for fields: All inputs in HTML get id from field.uuid. Div that contains all that belongs to the field has
     »container-{field.uuid}« for id, label has »label-{field.uuid}« and help text (if exists) has »help-{field.uuid}«
     for id.
+
+    The id is only generated when first needed, using strategy specified in DYNAMICFORMS_UUID_STRATEGY setting.
     """
 
     def __init__(self, *args, uuid: uuid_module.UUID = None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.uuid = uuid or uuid_module.uuid1()
+        self._uuid = uuid
+
+    @property
+    def uuid(self) -> uuid_module.UUID:
+        if self._uuid is None:
+            self._uuid = _uuid_strategy()(self)
+        return self._uuid
+
+    @uuid.setter
+    def uuid(self, value: uuid_module.UUID):
+        self._uuid = value
+
+
+# noinspection PyUnusedLocal
+def uuid1_strategy(obj: UUIDMixIn) -> uuid_module.UUID:
+    """
+    Generates a new time based uuid for every field and serializer. Ids differ with every render
+    """
+    return uuid_module.uuid1()
+
+
+_request_ids = threading.local()
+
+
+# noinspection PyUnusedLocal
+def _reset_request_ids(**kwargs):
+    # Upper 96 bits are random for every request so that ids in HTML fragments loaded later (e.g. a dialog) don't clash
+    # with ids already on the page. Lower 32 bits are a counter.
+    _request_ids.base = uuid_module.uuid4().int >> 32 << 32
+    _request_ids.counter = itertools.count(1)
+
+
+request_started.connect(_reset_request_ids, dispatch_uid='dynamicforms-reset-request-ids')
+
+
+# noinspection PyUnusedLocal
+def counter_strategy(obj: UUIDMixIn) -> uuid_module.UUID:
+    """
+    Numbers fields and serializers sequentially within a request. Much cheaper than uuid1
+    """
+    if not hasattr(_request_ids, 'counter'):
+        _reset_request_ids()
+    return uuid_module.UUID(int=_request_ids.base + next(_request_ids.counter))
+
+
+_DETERMINISTIC_NAMESPACE = uuid_module.UUID('8a7a6c2e-1e8e-5f0b-9a7c-6b0f2c1d3e4f')
+
+
+def deterministic_strategy(obj: UUIDMixIn) -> uuid_module.UUID:
+    """
+    Derives id from serializer classes and field names leading to the object and primary key of the record being
+    rendered. Rendering the same record with the same serializer always gives the same HTML, so it can be cached.
+
+    Role of the root serializer (its serializer_type, e.g. filter row) and kind of its instance (list, new record or
+    existing record) are part of the name too, so a table's filter row and a new record dialog of the same serializer
+    don't share ids. Ids are only unique on the page as long as the same record isn't rendered twice with the same
+    serializer in the same role.
+    """
+    parts, node, root = [], obj, obj
+    while node is not None:
+        parts.append('%s.%s:%s' % (type(node).__module__, type(node).__qualname__, getattr(node, 'field_name', '')))
+        root, node = node, getattr(node, 'parent', None)
+    instance = getattr(root, 'instance', None)
+    if instance is None or not hasattr(instance, 'pk'):
+        # For lists, instance is a list or a queryset and has no pk
+        instance = 'list' if instance is not None else 'none'
+    elif instance.pk is None:
+        instance = 'new'
+    else:
+        instance = 'pk=%s' % instance.pk
+    parts.append('%s:%s' % (getattr(root, 'serializer_type', None), instance))
+    return uuid_module.uuid5(_DETERMINISTIC_NAMESPACE, '/'.join(parts))
+
+
+UUID_STRATEGIES = dict(uuid1=uuid1_strategy, counter=counter_strategy, deterministic=deterministic_strategy)
+
+
+@lru_cache(maxsize=None)
+def _resolve_uuid_strategy(name: str) -> Callable[[UUIDMixIn], uuid_module.UUID]:
+    return UUID_STRATEGIES[name] if name in UUID_STRATEGIES else import_string(name)
+
+
+def _uuid_strategy() -> Callable[[UUIDMixIn], uuid_module.UUID]:
+    return _resolve_uuid_strategy(settings.UUID_STRATEGY)
 
 
 def _resolve_reference(serializer: Serializer, ref):
@@ -51,6 +154,77 @@ class Action(object):
         return Action([_resolve_reference(serializer, f) for f in self.tracked_fields], self.action_js)
 
 
+class ActionScript(NamedTuple):
+    """
+    Actions of a serializer class compiled into a static JavaScript module. The module references tracked fields by
+    name, so it is the same for every form of the class: browsers load it once (see urls, action-script) and each form
+    only passes a map of field names to its field ids (dynamicforms.registerFormActions).
+
+    Compiled once per serializer class, only when all tracked fields are referenced by serializer's field names.
+    """
+
+    hash: str  #: content hash, part of the script's URL and key of the module in dynamicforms.action_modules
+    script: str  #: JavaScript registering the module
+    field_names: Tuple[str, ...]  #: names of tracked fields
+    class_path: str  #: dotted path of the serializer class
+
+    signing_salt = 'dynamicforms.action-script'
+
+    @classmethod
+    def from_serializer(cls, serializer: Serializer) -> Optional['ActionScript']:
+        """
+        Compiles serializer's actions
+
+        :param serializer: Serializer instance
+        :return: ActionScript or None if serializer has no actions or they track fields other than by name
+        """
+        actions = list(serializer.actions or [])
+        for field in serializer.fields.values():
+            actions.extend(getattr(field, 'actions', []))
+        if not actions or not all(isinstance(ref, str) and ref in serializer.fields
+                                  for action in actions for ref in action.tracked_fields):
+            return None
+        # Action's JavaScript is evaluated when it runs, so the functions it names needn't exist when module loads
+        body = ',\n'.join(
+            '  [%s, function () { return (%s).apply(this, arguments); }]' % (json.dumps(action.tracked_fields),
+                                                                               action.action_js)
+            for action in actions
+        )
+        content_hash = hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]
+        klass = type(serializer)
+        return cls(
+            hash=content_hash,
+            script='dynamicforms.registerActionModule("%s", [\n%s\n]);\n' % (content_hash, body),
+            field_names=tuple(sorted({ref for action in actions for ref in action.tracked_fields})),
+            class_path=klass.__module__ + '.' + klass.__qualname__,
+        )
+
+    @property
+    def url(self) -> Optional[str]:
+        """
+        URL of the script or None if dynamicforms.urls are not included in url configuration
+        """
+        try:
+            url = reverse('dynamicforms:action-script', kwargs=dict(script_hash=self.hash))
+        except NoReverseMatch:
+            return None
+        # Signer, unlike signing.dumps, adds no timestamp: URL stays the same, so browsers can reuse cached script
+        return url + '?' + urlencode(dict(s=signing.Signer(salt=self.signing_salt).sign(self.class_path)))
+
+    @classmethod
+    def from_key(cls, key: str, context: dict = None) -> Optional['ActionScript']:
+        """
+        Returns action script of serializer class identified by signed key from url
+
+        :raises signing.BadSignature, ImportError, TypeError: when key doesn't identify a serializer class
+        """
+        serializer_class = import_string(signing.Signer(salt=cls.signing_salt).unsign(key))
+        if not (isinstance(serializer_class, type) and issubclass(serializer_class, ActionMixin) and
+                issubclass(serializer_class, Serializer)):
+            raise TypeError('%r is not a serializer with actions' % serializer_class)
+        return serializer_class(context=context or {}).action_script
+
+
 class ActionMixin(object):
     """
     Used in fields allowing declaration of actions that happen when field values change
@@ -82,6 +256,161 @@ class ActionMixin(object):
 
         return self._actions
 
+    @property
+    def action_script(self) -> Optional[ActionScript]:
+        """
+        Serializer's actions compiled into a JavaScript module, once per serializer class
+
+        :return: ActionScript or None when actions must be registered per form (see ActionScript.from_serializer).
+           Always None for serializers declaring cache_fields = False, as their fields may differ among instances
+        """
+        if not isinstance(self, Serializer) or not getattr(self, 'cache_fields', False):
+            return None
+        klass = type(self)
+        if '_action_script' not in klass.__dict__:
+            klass._action_script = ActionScript.from_serializer(self)
+        return klass.__dict__['_action_script']
+
+
+class RelatedOptionsMixin(object):
+    """
+    Used in related fields: lets select2 load the field's options from the server as the user types, a page at a time,
+    instead of rendering all records of the related queryset into the form. Options that are rendered inline can be
+    cached among requests with cache_choices.
+
+    Options are served by dynamicforms.urls (related-options). The URL identifies the serializer class and field with a
+    signed key, so the field doesn't need to be registered anywhere. The key also names the viewset that rendered the
+    field, whose permissions the request for options must then pass, and expires after
+    DYNAMICFORMS_OPTIONS_KEY_MAX_AGE seconds. Fields with at most options_threshold options
+    (DYNAMICFORMS_OPTIONS_INLINE_LIMIT by default) still render them inline, as do all fields when select2 is disabled
+    or dynamicforms.urls are not included in url configuration. So do fields that have nothing to search the typed
+    term in: primary key related fields without label_field.
+    """
+
+    signing_salt = 'dynamicforms.related-options'
+
+    def __init__(self, *args, label_field: str = None, options_threshold: int = None, cache_choices: bool = False,
+                 **kwargs):
+        """
+        :param label_field: related model field shown as option label and searched for the typed term. When not
+           given, labels are rendered by display_value and only slug related fields are searched (by slug_field)
+        :param options_threshold: fields with at most this many options render them inline
+        :param cache_choices: share choices rendered inline among requests (see cache.ChoicesCache)
+        """
+        super().__init__(*args, **kwargs)
+        self.label_field = label_field
+        self.options_threshold = options_threshold
+        self.cache_choices = cache_choices
+
+    def get_choices(self, cutoff=None):
+        if not self.cache_choices:
+            return super().get_choices(cutoff)
+        queryset = self.get_queryset()
+        if queryset is None:
+            return {}
+        if cutoff is not None:
+            queryset = queryset[:cutoff]
+        return choices_cache.get_or_build(self, queryset, lambda: super(RelatedOptionsMixin, self).get_choices(cutoff))
+
+    @property
+    def options_url(self) -> Optional[str]:
+        """
+        URL for loading options or None if options are rendered inline
+        """
+        if '_options_url' not in self.__dict__:
+            self._options_url = self._get_options_url()
+        return self._options_url
+
+    def _get_options_url(self) -> Optional[str]:
+        threshold = settings.OPTIONS_INLINE_LIMIT if self.options_threshold is None else self.options_threshold
+        # Without a field to search, the user couldn't narrow the options down: they are rendered inline then
+        if threshold is None or self.read_only or not settings.TEMPLATE_OPTIONS.USE_SELECT2 or \
+                not isinstance(self.parent, Serializer) or self._search_field() is None:
+            return None
+        try:
+            url = reverse('dynamicforms:related-options')
+        except NoReverseMatch:
+            return None
+        if not count_exceeds(self.get_queryset(), threshold):
+            return None
+        parent, view = type(self.parent), self.parent.context.get('view', None)
+        view_path = None if view is None else type(view).__module__ + '.' + type(view).__qualname__
+        key = signing.dumps([parent.__module__ + '.' + parent.__qualname__, self.field_name, view_path],
+                            salt=self.signing_salt)
+        return url + '?' + urlencode(dict(field=key))
+
+    @classmethod
+    def load_key(cls, key: str) -> Tuple[type, str, Optional[type]]:
+        """
+        Returns what key from options_url identifies
+
+        :param key: signed key
+        :return: serializer class, field name and class of the viewset that rendered the field (None if no viewset did)
+        :raises signing.BadSignature, ImportError, TypeError, ValueError: when key is invalid or expired
+        """
+        class_path, field_name, view_path = signing.loads(key, salt=cls.signing_salt,
+                                                          max_age=settings.OPTIONS_KEY_MAX_AGE)
+        return import_string(class_path), field_name, import_string(view_path) if view_path else None
+
+    @classmethod
+    def from_serializer(cls, serializer_class: type, field_name: str, context: dict = None) -> 'RelatedOptionsMixin':
+        """
+        Returns field of serializer that serves options
+
+        :param serializer_class: serializer class (see load_key)
+        :param field_name: field name
+        :param context: serializer context
+        :return: field
+        :raises KeyError, TypeError: when serializer has no such field
+        """
+        field = serializer_class(context=context or {}).fields[field_name]
+        if not isinstance(field, cls):
+            raise TypeError('%s.%s has no options to serve' % (serializer_class.__name__, field_name))
+        return field
+
+    def option_label(self, obj) -> str:
+        return str(getattr(obj, self.label_field)) if self.label_field else str(self.display_value(obj))
+
+    def _search_field(self) -> Optional[str]:
+        return self.label_field or getattr(self, 'slug_field', None)
+
+    def options_page(self, term: str = '', cursor: str = None,
+                     page_size: int = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        Returns a page of options whose label contains term, ordered by primary key
+
+        :param term: text the user typed
+        :param cursor: cursor of the page (returned with the previous page)
+        :param page_size: number of options in a page (DYNAMICFORMS_OPTIONS_PAGE_SIZE by default)
+        :return: tuple (list of {id, text}, cursor of the next page or None if this is the last page)
+        """
+        page_size = page_size or settings.OPTIONS_PAGE_SIZE
+        queryset = self.get_queryset()
+        search_field = self._search_field()
+        if term and search_field:
+            queryset = queryset.filter(**{search_field + '__icontains': term})
+        if cursor:
+            queryset = queryset.filter(pk__gt=queryset.model._meta.pk.to_python(cursor))
+        records = list(queryset.order_by('pk')[:page_size + 1])
+        results = [dict(id=self.to_representation(obj), text=self.option_label(obj)) for obj in records[:page_size]]
+        return results, str(records[page_size - 1].pk) if len(records) > page_size else None
+
+    def selected_options(self, value) -> List[dict]:
+        """
+        Returns option for currently selected value: the only one rendered inline when options are loaded by select2
+
+        :param value: field value
+        :return: list with {value, display_text} for the selected value, empty if nothing is selected
+        """
+        if value in (None, ''):
+            return []
+        lookup = getattr(self, 'slug_field', None) or 'pk'
+        try:
+            objects = list(self.get_queryset().filter(**{lookup: value})[:1])
+        except (TypeError, ValueError, DjangoValidationError):
+            return []
+        return [dict(value=self.to_representation(obj), display_text=self.option_label(obj)) for obj in objects]
+
 
 class RenderToTableMixin(object):
     """
@@ -99,8 +428,117 @@ class RenderToTableMixin(object):
         :param row_data: data for entire row (for more complex renderers)
         :return: rendered value for table view
         """
-        choices = getattr(self, 'choices', {})
-        if value in choices:
+        choices = self.get_table_choices((value,))
+        if choices and value in choices:
             # choice field: let's render display names, not values
-            return drftt.format_value(choices[value])
+            return choices[value]
+        return drftt.format_value(value)
+
+    def render_to_table_column(self, values: List, rows: List) -> List[str]:
+        """
+        Renders a whole column of field values for table view in one pass. Output is the same as calling render_to_table
+        for each of the values, but the work that doesn't depend on individual value is only done once.
+
+        If the field overrides render_to_table, that one is called for every value instead.
+
+        :param values: field values, one for each row
+        :param rows: data for entire rows
+        :return: rendered values for table view
+        """
+        if type(self).render_to_table is not RenderToTableMixin.render_to_table:
+            return [self.render_to_table(value, row) for value, row in zip(values, rows)]
+        choices = self.get_table_choices(values)
+        formatter = self.get_table_formatter()
+        if choices:
+            return [choices[value] if value in choices else formatter(value) for value in values]
+        return [formatter(value) for value in values]
+
+    def get_table_formatter(self) -> Callable:
+        """
+        Selects the function that renders a single field value for table view, based on field type
+
+        :return: function(value) -> rendered value
+        """
+        if isinstance(self, (fields.BooleanField, fields.NullBooleanField)):
+            return lambda value: _format_code[value] if value is None or isinstance(value, bool) else \
+                drftt.format_value(value)
+        if isinstance(self, _format_plain_fields):
+            return _format_plain
+        return drftt.format_value
+
+    def get_table_choices(self, values: Iterable) -> Mapping:
+        """
+        Returns index of rendered display names for field values that are choices
+
+        Static choices are indexed once per process. Labels of primary key and slug related fields are only resolved for
+        given values, with a single query. They are remembered on the field (for the duration of the request) so that
+        rendering the same values again doesn't query the database.
+
+        :param values: field values that are going to be rendered
+        :return: mapping value -> rendered display name. Values that are not valid choices are not included
+        """
+        if isinstance(self, (relations.PrimaryKeyRelatedField, relations.SlugRelatedField)):
+            return self._get_related_table_choices(values)
+        choices = getattr(self, 'choices', None)
+        if not choices:
+            return _no_choices
+        if isinstance(self, relations.RelatedField):
+            # choices come from database and are evaluated on each access: index them once per field
+            if '_table_choices' not in self.__dict__:
+                self._table_choices = MappingProxyType({k: drftt.format_value(v) for k, v in choices.items()})
+            return self._table_choices
+        # Called for every cell: the shared index is looked up once per field instance and language (and again only if
+        # field's choices are replaced), as building its key takes time proportional to the number of choices
+        language = get_language()
+        memo = self.__dict__.get('_table_choices_index', None)
+        if memo is not None and memo[0] is choices and memo[1] == language:
+            return memo[2]
+        try:
+            res = _static_table_choices(language, tuple(choices.items()))
+        except TypeError:
+            res = MappingProxyType({k: drftt.format_value(v) for k, v in choices.items()})
+        self._table_choices_index = (choices, language, res)
+        return res
+
+    def _get_related_table_choices(self, values):
+        if '_table_choices' not in self.__dict__:
+            self._table_choices, self._table_choices_resolved = {}, set()
+        missing = {value for value in values if value is not None and value not in self._table_choices_resolved}
+        queryset = self.get_queryset() if missing else None
+        if queryset is not None:
+            if isinstance(self, relations.SlugRelatedField):
+                objects = queryset.filter(**{self.slug_field + '__in': missing})
+            else:
+                objects = queryset.in_bulk(missing).values()
+            for obj in objects:
+                self._table_choices[self.to_representation(obj)] = drftt.format_value(self.display_value(obj))
+        self._table_choices_resolved.update(missing)
+        return self._table_choices
+
+
+_no_choices = MappingProxyType({})
+
+
+# Rendered display names of static choices: (language, choices) -> mapping value -> display name. Bounded, as choices
+# may be built dynamically (e.g. per request)
+# noinspection PyUnusedLocal
+@lru_cache(maxsize=256)
+def _static_table_choices(language: str, choices: tuple) -> Mapping:
+    return MappingProxyType({k: drftt.format_value(v) for k, v in choices})
+
+
+# Values, rendered in <code> by drftt.format_value
+_format_code = {v: mark_safe('<code>%s</code>' % {True: 'true', False: 'false', None: 'null'}[v])
+                for v in (True, False, None)}
+
+# Fields whose values drftt.format_value renders as plain text unless they are strings or None
+_format_plain_fields = (fields.IntegerField, fields.FloatField, fields.DecimalField, fields.DateTimeField,
+                        fields.DateField, fields.TimeField, fields.DurationField, fields.UUIDField)
+
+
+def _format_plain(value):
+    if value is None:
+        return _format_code[None]
+    if isinstance(value, str):
         return drftt.format_value(value)
+    return str(value)
@@ -0,0 +1,239 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from functools import reduce
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import record_count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates by keyset: a page is the first page_size records whose ordering key comes after (or before, when
+    scrolling back) the key of the last record already shown. Unlike offset pagination the database only ever reads
+    page_size records, no matter how deep into the list the page is, as long as an index backs the ordering.
+
+    Ordering can be chosen by the client with ordering_param (e.g. ?ordering=-name,date) from fields listed in
+    ordering_fields. Primary key is always added as the last ordering field so that the ordering key is unique.
+    Cursors encode the complete key of the boundary record, so ties in the leading fields are handled without offsets.
+    Ordering fields must not be nullable.
+
+    Use with ModelViewSet.generate_paged_loader
+    """
+
+    page_size = 30  #: number of records per page
+    ordering = ('id',)  #: default ordering
+    ordering_fields = ()  #: fields the client may order by. Each one should be backed by an index
+    ordering_param = 'ordering'  #: query parameter with requested ordering
+    cursor_query_param = 'cursor'  #: query parameter with the cursor
+    invalid_cursor_message = 'Invalid cursor'
+    include_count = False  #: when true, response includes (estimated or cached) number of records. See record_count
+
+    display_page_controls = False
+
+    def get_ordering(self, request, queryset) -> Tuple[str, ...]:
+        """
+        Returns ordering for the request: requested one when all of its fields are allowed, default one otherwise.
+        Primary key is appended if the ordering doesn't include it already
+
+        :param request: Request
+        :param queryset: Queryset being paginated
+        :return: tuple of field names, prefixed with '-' for descending order
+        """
+        ordering = self.ordering
+        requested = request.query_params.get(self.ordering_param, None)
+        if requested:
+            requested = tuple(f.strip() for f in requested.split(',') if f.strip())
+            if requested and all(f.lstrip('-') in self.ordering_fields for f in requested):
+                ordering = requested
+
+        pk = queryset.model._meta.pk.name
+        ordering = tuple(f[:-2] + pk if f.lstrip('-') == 'pk' else f for f in ordering)
+        if not any(f.lstrip('-') == pk for f in ordering):
+            ordering = tuple(ordering) + (('-' if ordering and ordering[-1].startswith('-') else '') + pk,)
+        return tuple(ordering)
+
+    def decode_cursor(self, request, ordering, model) -> Optional[Tuple[List, bool]]:
+        """
+        Decodes cursor from the request
+
+        :return: None for first page or tuple (ordering key values, reverse)
+        """
+        encoded = request.query_params.get(self.cursor_query_param, None)
+        if encoded is None:
+            return None
+        try:
+            cursor = b64decode(encoded.encode('ascii')).decode('utf-8')
+            if cursor.startswith('{'):
+                cursor = json.loads(cursor)
+            else:
+                # Cursor made by DRF's CursorPagination (the previous paged loader): position of the first field
+                tokens = parse_qs(cursor, keep_blank_values=True)
+                cursor = dict(o=list(ordering[:1]), p=tokens['p'][:1], r=tokens.get('r', ['0'])[0] == '1')
+            if cursor['o'] != list(ordering):
+                # ordering changed since the cursor was made: start from the beginning
+                return None
+            values = [model._meta.get_field(f.lstrip('-')).to_python(v) for f, v in zip(ordering, cursor['p'])]
+            return values, bool(cursor['r'])
+        except (TypeError, ValueError, KeyError, ValidationError, FieldDoesNotExist, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, ordering, record, reverse: bool) -> str:
+        """
+        Returns URL pointing to records after (or before, if reverse) given record
+        """
+        # value_to_string keeps full precision (DjangoJSONEncoder would cut datetimes to milliseconds, making the
+        # boundary record match the filter again). decode_cursor converts values back with field's to_python
+        values = [record._meta.get_field(f.lstrip('-')).value_to_string(record) for f in ordering]
+        cursor = json.dumps(dict(o=list(ordering), p=values, r=reverse), separators=(',', ':'))
+        return replace_query_param(self.base_url, self.cursor_query_param,
+                                   b64encode(cursor.encode('utf-8')).decode('ascii'))
+
+    @staticmethod
+    def keyset_filter(ordering, values, reverse: bool) -> Q:
+        """
+        Returns condition for records following (or preceding, if reverse) the record with given ordering key
+
+        :param ordering: ordering field names, prefixed with '-' for descending order
+        :param values: ordering key of the boundary record
+        :param reverse: True for records preceding the boundary
+        :return: Q
+        """
+        def op(field):
+            return 'lt' if field.startswith('-') != reverse else 'gt'
+
+        names = [f.lstrip('-') for f in ordering]
+        # (a > x) | (a = x & b > y) | (a = x & b = y & c > z) ...
+        conditions = [
+            Q(**{'%s__%s' % (names[i], op(ordering[i])): values[i]}, **dict(zip(names[:i], values[:i])))
+            for i in range(len(ordering))
+        ]
+        # Redundant a >= x lets the database start an index range scan at the boundary
+        return Q(**{'%s__%se' % (names[0], op(ordering[0])): values[0]}) & reduce(lambda a, b: a | b, conditions)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.count, self.count_estimated = record_count(queryset) if self.include_count else (None, False)
+        ordering = self.get_ordering(request, queryset)
+        cursor = self.decode_cursor(request, ordering, queryset.model)
+        reverse = cursor is not None and cursor[1]
+
+        fields, deferred = queryset.query.deferred_loading
+        if fields and not deferred:
+            # queryset.only() is in effect: ordering key must be loaded too
+            queryset = queryset.only(*fields, *(f.lstrip('-') for f in ordering))
+
+        if reverse:
+            queryset = queryset.order_by(*(f[1:] if f.startswith('-') else '-' + f for f in ordering))
+        else:
+            queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, cursor[0], reverse))
+
+        records = list(queryset[:self.page_size + 1])
+        has_more = len(records) > self.page_size
+        records = records[:self.page_size]
+        if reverse:
+            records.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = cursor is not None and (has_more if reverse else True)
+        self.next_link = self.encode_cursor(ordering, records[-1], False) if has_next and records else None
+        if has_previous and records:
+            self.previous_link = self.encode_cursor(ordering, records[0], True)
+        elif cursor is not None and not reverse:
+            # Nothing after the cursor: first page is the only way back
+            self.previous_link = remove_query_param(self.base_url, self.cursor_query_param)
+        else:
+            self.previous_link = None
+        return records
+
+    def get_next_link(self):
+        return self.next_link
+
+    def get_previous_link(self):
+        return self.previous_link
+
+    def get_paginated_response(self, data):
+        res = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.include_count:
+            res.update(count=self.count, count_estimated=self.count_estimated)
+        res['results'] = data
+        return Response(res)
+
+
+def _has_index(model, field_name: str) -> bool:
+    field = model._meta.get_field(field_name)
+    if field.primary_key or field.unique or getattr(field, 'db_index', False):
+        return True
+    leading = [fields[0] for fields in model._meta.unique_together + model._meta.index_together if fields]
+    leading += [index.fields[0].lstrip('-') for index in model._meta.indexes if index.fields]
+    return field_name in leading
+
+
+def check_view_ordering(view) -> List[checks.CheckMessage]:
+    """
+    Checks that every ordering the view's KeysetPagination allows is backed by an index
+
+    :param view: ViewSet class
+    :return: list of check messages
+    """
+    errors, paginator, model = [], view.pagination_class, view.queryset.model
+    for name in sorted({f.lstrip('-') for f in tuple(paginator.ordering) + tuple(paginator.ordering_fields)}):
+        if name == 'pk':
+            continue
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            errors.append(checks.Error(
+                '%s orders by %s, which is not a field of %s' % (view.__name__, name, model._meta.label),
+                obj=view, id='dynamicforms.E001'
+            ))
+            continue
+        if field.null:
+            errors.append(checks.Warning(
+                '%s allows ordering by %s.%s, which is nullable' % (view.__name__, model._meta.label, name),
+                hint='Records with null values are skipped when paging', obj=view, id='dynamicforms.W002'
+            ))
+        if not _has_index(model, name):
+            errors.append(checks.Warning(
+                '%s allows ordering by %s.%s, which has no index' % (view.__name__, model._meta.label, name),
+                hint='Add db_index=True or an index starting with this field, so that pages are read efficiently',
+                obj=view, id='dynamicforms.W001'
+            ))
+    return errors
+
+
+# noinspection PyUnusedLocal
+def check_keyset_indexes(app_configs=None, **kwargs):
+    """
+    System check: runs check_view_ordering for all views in url configuration that use KeysetPagination
+    """
+    from django.urls import get_resolver
+
+    errors, seen, patterns = [], set(), list(get_resolver().url_patterns)
+    while patterns:
+        pattern = patterns.pop()
+        if hasattr(pattern, 'url_patterns'):
+            patterns.extend(pattern.url_patterns)
+            continue
+        view = getattr(getattr(pattern, 'callback', None), 'cls', None)
+        paginator = getattr(view, 'pagination_class', None)
+        if view in seen or getattr(view, 'queryset', None) is None or \
+                not (isinstance(paginator, type) and issubclass(paginator, KeysetPagination)):
+            continue
+        seen.add(view)
+        errors.extend(check_view_ordering(view))
+    return errors
@@ -0,0 +1,107 @@
+from typing import NamedTuple, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import relations
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+def _maximal(paths) -> Tuple[str, ...]:
+    # select_related('a__b') also selects 'a': drop paths that are a prefix of another path
+    return tuple(sorted(p for p in paths if not any(o.startswith(p + '__') for o in paths)))
+
+
+def _pk_only(field) -> bool:
+    # DRF reads only the foreign key column for these fields, related object is never loaded
+    return isinstance(field, relations.RelatedField) and field.use_pk_only_optimization()
+
+
+class QueryPlan(NamedTuple):
+    """
+    Describes how to query records for a serializer so that serializing a list of them doesn't do a query per record.
+
+    Relations followed by the serializer's fields (including dotted sources and nested serializers) are collected once
+    per serializer class (per instance when its cache_fields is False): forward foreign keys and one-to-one relations
+    are loaded with select_related, reverse and many-to-many relations with prefetch_related.
+    """
+
+    select_related: Tuple[str, ...]  #: paths for queryset.select_related
+    prefetch_related: Tuple[str, ...]  #: paths for queryset.prefetch_related
+    only: Tuple[str, ...] = ()  #: columns for queryset.only. When empty, all columns are loaded
+
+    @classmethod
+    def from_serializer(cls, serializer, field_names=None) -> 'QueryPlan':
+        """
+        Collects relations that the serializer reads
+
+        :param serializer: Serializer instance
+        :param field_names: when given, only these serializer fields are serialized: relations are collected for them
+           only and loading of record columns is limited to those the fields read
+        :return: QueryPlan
+        """
+        select, prefetch = set(), set()
+        model = serializer.Meta.model
+        cls._collect(serializer, model, '', False, select, prefetch, field_names)
+        only = () if field_names is None else cls._columns(serializer, model, field_names)
+        return cls(select_related=_maximal(select), prefetch_related=_maximal(prefetch), only=only)
+
+    @classmethod
+    def _columns(cls, serializer, model, field_names) -> Tuple[str, ...]:
+        # Returns () when a field reads something we can't resolve to columns: all columns must be loaded then
+        declared = getattr(serializer, 'field_columns', None) or {}
+        columns = {model._meta.pk.name}
+        for name in field_names:
+            if name in declared:
+                columns.update(declared[name])
+                continue
+            source_attrs = serializer.fields[name].source_attrs
+            if not source_attrs:
+                return ()
+            try:
+                model_field = model._meta.get_field(source_attrs[0])
+            except FieldDoesNotExist:
+                return ()
+            if model_field.concrete:
+                columns.add(model_field.name)
+            elif not model_field.is_relation or model_field.related_model is None:
+                return ()
+        return tuple(sorted(columns))
+
+    @classmethod
+    def _collect(cls, serializer, model, prefix, many, select, prefetch, field_names=None):
+        for name, field in serializer.fields.items():
+            if field.write_only or (field_names is not None and name not in field_names):
+                continue
+            path, current, in_many, source_attrs = prefix, model, many, field.source_attrs
+            for idx, attr in enumerate(source_attrs):
+                try:
+                    model_field = current._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    break
+                if not model_field.is_relation or model_field.related_model is None:
+                    break
+                if idx == len(source_attrs) - 1 and _pk_only(field) and model_field.concrete and \
+                        (model_field.many_to_one or model_field.one_to_one):
+                    break
+                path = path + '__' + attr if path else attr
+                in_many = in_many or model_field.many_to_many or model_field.one_to_many
+                (prefetch if in_many else select).add(path)
+                current = model_field.related_model
+            else:
+                nested = field.child if isinstance(field, ListSerializer) else field
+                if isinstance(nested, BaseSerializer) and hasattr(nested, 'fields'):
+                    cls._collect(nested, current, path, in_many, select, prefetch)
+
+    def apply(self, queryset):
+        """
+        Applies select_related, prefetch_related and only to the queryset
+
+        :param queryset: Queryset
+        :return: Queryset
+        """
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
@@ -1,3 +1,6 @@
+import threading
+from itertools import islice
+
 import six
 from django.template import loader
 from rest_framework.renderers import HTMLFormRenderer, TemplateHTMLRenderer
@@ -5,6 +8,7 @@ from rest_framework.serializers import HiddenField, ListSerializer
 from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 
 from . import settings
+from .cache import templates_cacheable
 
 
 # noinspection PyRedeclaration
@@ -22,17 +26,23 @@ class TemplateHTMLRenderer(TemplateHTMLRenderer):
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         link_next = link_prev = ''
+        record_count, record_count_estimated = None, False
 
         if isinstance(data, dict) and 'next' in data and 'results' in data and \
                 isinstance(data['results'], (ReturnList, ReturnDict)):
             # This is in case of Pagination
             link_next = data.get('next', '')
             link_prev = data.get('previous', '')
+            record_count = data.get('count', None)
+            record_count_estimated = data.get('count_estimated', False)
             data = data['results']
         if isinstance(data, (ReturnList, ReturnDict)):
             ser = data.serializer
+            if isinstance(ser, ListSerializer):
+                self.prepare_table_choices(ser.child, data)
             data = dict(data=data, serializer=ser.child if isinstance(ser, ListSerializer) else ser,
-                        link_next=link_next, link_prev=link_prev)
+                        link_next=link_next, link_prev=link_prev, record_count=record_count,
+                        record_count_estimated=record_count_estimated)
 
             if getattr(ser, '_errors', {}):
                 # unmark exception from response because this was a validation error
@@ -50,8 +60,21 @@ class TemplateHTMLRenderer(TemplateHTMLRenderer):
 
     def get_template_context(self, data, renderer_context):
         res = super().get_template_context(data, renderer_context)
-        view = renderer_context['view']
-        if hasattr(view, 'template_context'):
+        res.update(self.get_view_context(renderer_context['view']))
+        return res
+
+    # noinspection PyMethodMayBeStatic
+    def get_view_context(self, view):
+        """
+        Returns template context variables provided by the view (template_context) and DynamicForms configuration
+
+        :param view: ViewSet being rendered
+        :return: dict with context variables
+        """
+        res = {}
+        if hasattr(view, 'get_template_context'):
+            res.update(view.get_template_context())
+        elif hasattr(view, 'template_context'):
             if callable(view.template_context):
                 res.update(view.template_context())
             else:
@@ -60,6 +83,89 @@ class TemplateHTMLRenderer(TemplateHTMLRenderer):
         res['DF'] = settings.CONTEXT_VARS
         return res
 
+    # noinspection PyMethodMayBeStatic
+    def prepare_table_choices(self, serializer, data):
+        """
+        Resolves display names of choice values in all table columns at once, e.g. with a single query per related
+        field instead of one for each row
+
+        :param serializer: Serializer that produced the data
+        :param data: list of records to be rendered
+        """
+        if not hasattr(serializer, 'table_layout'):
+            return
+        for column in serializer.table_layout.columns:
+            field = serializer.fields[column]
+            if hasattr(field, 'get_table_choices'):
+                field.get_table_choices([row[column] for row in data])
+
+    #: Rendered in place of table rows when list template is split into table head and table footer for streaming
+    stream_marker = 'dynamicforms-stream-table-rows'
+
+    def render_stream(self, view, queryset, chunk_size: int):
+        """
+        Renders records of the queryset in chunks as they are read from database: first the table head, then table rows
+        for each chunk of records and finally the table footer with paginator script.
+
+        Only one chunk of records is ever held in memory. QuerySet.iterator ignores prefetch_related, so querysets with
+        prefetches (e.g. from the serializer's query_plan) are streamed by reading primary keys first and then loading
+        each chunk of records by them, with prefetches (see iterate_chunks).
+
+        :param view: ViewSet being rendered
+        :param queryset: records to render
+        :param chunk_size: number of records read from database and rendered at a time
+        :return: generator of rendered HTML fragments
+        """
+        request = view.request
+        template = loader.get_template(view.template_name)
+        context = self.get_view_context(view)
+        context.update(link_next='', link_prev='')
+
+        serializer = view.get_serializer([], many=True).child
+        serializer.render_type = view.render_type
+        serializer.data_template = view.template_name
+        head, foot = template.render(dict(context, serializer=serializer, data=[], df_stream_marker=self.stream_marker),
+                                     request=request).split(self.stream_marker)
+        yield head
+
+        chunks = self.iterate_chunks(queryset, chunk_size)
+        chunk = next(chunks, [])
+        first = True
+        while chunk or first:
+            data = view.get_serializer(chunk, many=True).data
+            data.serializer.child.render_type = 'table rows'
+            data.serializer.child.data_template = view.template_name
+            self.prepare_table_choices(data.serializer.child, data)
+            yield template.render(dict(context, serializer=data.serializer.child, data=data), request=request)
+            chunk, first = next(chunks, []), False
+
+        yield foot
+
+    @staticmethod
+    def iterate_chunks(queryset, chunk_size: int):
+        """
+        Reads records of the queryset in chunks
+
+        :param queryset: records to read
+        :param chunk_size: number of records in a chunk
+        :return: generator of lists of records
+        """
+        # noinspection PyProtectedMember
+        if not queryset._prefetch_related_lookups:
+            records = queryset.iterator(chunk_size=chunk_size)
+            chunk = list(islice(records, chunk_size))
+            while chunk:
+                yield chunk
+                chunk = list(islice(records, chunk_size))
+            return
+
+        pks = queryset.prefetch_related(None).values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+        chunk = list(islice(pks, chunk_size))
+        while chunk:
+            records = {record.pk: record for record in queryset.filter(pk__in=chunk)}
+            yield [records[pk] for pk in chunk if pk in records]
+            chunk = list(islice(pks, chunk_size))
+
 
 # noinspection PyRedeclaration
 class HTMLFormRenderer(HTMLFormRenderer):
@@ -80,17 +186,84 @@ class HTMLFormRenderer(HTMLFormRenderer):
         return Response(data, template_name='users.html')
     """
 
-    def render_field(self, field, parent_style):
+    # Resolved templates, shared between all renderer instances and threads:
+    #   (field class, field style, template pack) -> (field style with defaults, Template) for fields
+    #   template name -> Template for forms
+    # Not used when templates are reloaded on change (see cache.templates_cacheable)
+    _field_templates = {}
+    _form_templates = {}
+    _templates_lock = threading.Lock()
+
+    @classmethod
+    def clear_template_cache(cls):
+        """
+        Forgets all resolved templates
+        """
+        with cls._templates_lock:
+            cls._field_templates.clear()
+            cls._form_templates.clear()
+
+    def get_field_template(self, field, parent_style):
+        """
+        Resolves style and template for given field. The result is remembered for field class, field style and template
+        pack, so the lookup is only done once
+
+        :param field: BoundField
+        :param parent_style: style of the form being rendered
+        :return: tuple (field style with defaults, Template)
+        """
+        template_pack = parent_style.get('template_pack', self.template_pack)
         # noinspection PyProtectedMember
-        if isinstance(field._field, HiddenField):
-            return ''
+        key = (type(field._field), tuple(sorted(field.style.items())), template_pack)
+        if not templates_cacheable():
+            key = None
+        else:
+            try:
+                return self._field_templates[key]
+            except TypeError:
+                key = None  # style contains unhashable values: don't cache
+            except KeyError:
+                pass
 
         style = dict(self.default_style[field])
         style.update(field.style)
         if 'template_pack' not in style:
-            style['template_pack'] = parent_style.get('template_pack', self.template_pack)
-        style['serializer'] = parent_style.get('serializer', None)
-        style['renderer'] = self
+            style['template_pack'] = template_pack
+
+        if 'template' in style:
+            template_name = style['template']
+        else:
+            template_name = style['template_pack'].strip('/') + '/' + style['base_template']
+
+        res = style, loader.get_template(template_name)
+        if key is not None:
+            with self._templates_lock:
+                self._field_templates[key] = res
+        return res
+
+    def get_form_template(self, template_name):
+        """
+        Returns template for rendering the form. Resolved templates are remembered
+
+        :param template_name: template name
+        :return: Template
+        """
+        if not templates_cacheable():
+            return loader.get_template(template_name)
+        template = self._form_templates.get(template_name, None)
+        if template is None:
+            template = loader.get_template(template_name)
+            with self._templates_lock:
+                self._form_templates[template_name] = template
+        return template
+
+    def render_field(self, field, parent_style):
+        # noinspection PyProtectedMember
+        if isinstance(field._field, HiddenField):
+            return ''
+
+        style, template = self.get_field_template(field, parent_style)
+        style = dict(style, serializer=parent_style.get('serializer', None), renderer=self)
 
         # Get a clone of the field with text-only value representation.
         field = field.as_form_field()
@@ -98,12 +271,6 @@ class HTMLFormRenderer(HTMLFormRenderer):
         if style.get('input_type') == 'datetime-local' and isinstance(field.value, six.text_type):
             field.value = field.value.rstrip('Z')
 
-        if 'template' in style:
-            template_name = style['template']
-        else:
-            template_name = style['template_pack'].strip('/') + '/' + style['base_template']
-
-        template = loader.get_template(template_name)
         context = {
             'field': field,
             'style': style,
@@ -133,7 +300,7 @@ class HTMLFormRenderer(HTMLFormRenderer):
             template_pack + '/' + self.base_template  # take default template from pack
         ) if x))
 
-        template = loader.get_template(template_name)
+        template = self.get_form_template(template_name)
         context = {
             'form': form,
             'style': style,
@@ -1,3 +1,7 @@
+import copy
+import threading
+from collections import OrderedDict
+
 from django.db import models
 
 from rest_framework import serializers
@@ -6,6 +10,8 @@ from dynamicforms.action import ActionControls
 from dynamicforms.settings import TEMPLATE
 from .fields import *
 from .mixins import UUIDMixIn, ActionMixin
+from .query import QueryPlan
+from .table import TableLayout
 
 
 class ModelSerializer(UUIDMixIn, ActionMixin, serializers.ModelSerializer):
@@ -76,7 +82,32 @@ class ModelSerializer(UUIDMixIn, ActionMixin, serializers.ModelSerializer):
     }
 
     show_filter = False  # When true, filter row is shown for list view
+    use_row_renderer = False  # When true, table rows are rendered by a function built for serializer class (faster)
+    row_cache = False  # When true (and use_row_renderer too), rendered table rows are cached (see cache.RowCache)
     serializer_type = None  # Current types: None, 'filter'
+    text_filter = 'icontains'  # How text fields are filtered: 'icontains', 'prefix', 'exact' or 'fulltext'
+    text_filters = {}  # Text filter strategies for individual fields (field name -> strategy), overriding text_filter
+    table_fields_only = False  # When true, only fields the table needs are serialized. Set by ModelViewSet for tables
+    field_columns = {}  # Model columns that fields with computed values read (field name -> column names)
+    cache_fields = True  # When true, fields are built once per class and cloned for instances. See get_fields
+
+    def get_fields(self):
+        """
+        Returns fields for this serializer instance.
+
+        Building fields (model introspection, field construction) is done only once per serializer class. Instances get
+        clones of these prototype fields. Declare `cache_fields = False` on serializers that build their fields
+        dynamically (e.g. based on context or instance).
+
+        :return: dict field name -> field instance
+        """
+        if not self.cache_fields:
+            return super().get_fields()
+        prototypes = type(self).__dict__.get('_field_prototypes', None)
+        if prototypes is None:
+            prototypes = super().get_fields()
+            type(self)._field_prototypes = prototypes
+        return OrderedDict((name, _clone_field(field)) for name, field in prototypes.items())
 
     @property
     def has_non_field_errors(self):
@@ -103,18 +134,109 @@ class ModelSerializer(UUIDMixIn, ActionMixin, serializers.ModelSerializer):
         else:
             return self.form_titles.get('new', '')
 
-    # noinspection PyProtectedMember
+    def _memo(self, name: str, build):
+        # Stored on the class, unless fields differ among instances (cache_fields = False): then on the instance
+        holder = type(self) if self.cache_fields else self
+        res = holder.__dict__.get(name, None)
+        if res is None:
+            res = build()
+            setattr(holder, name, res)
+        return res
+
+    @property
+    def table_layout(self) -> TableLayout:
+        """
+        Returns layout of the table view for this serializer. It is computed on first use and stored on the class (on
+        the instance, if cache_fields is False)
+
+        :return: TableLayout
+        """
+        return self._memo('_table_layout', lambda: TableLayout.from_serializer(self))
+
+    @property
+    def query_plan(self) -> QueryPlan:
+        """
+        Returns relations that must be loaded along with records for this serializer. It is computed on first use and
+        stored on the class (on the instance, if cache_fields is False)
+
+        :return: QueryPlan
+        """
+        return self._memo('_query_plan', lambda: QueryPlan.from_serializer(self))
+
+    @property
+    def table_query_plan(self) -> QueryPlan:
+        """
+        Returns relations and columns that must be loaded for records rendered in a table (see table_fields_only). It is
+        computed on first use and stored on the class (on the instance, if cache_fields is False)
+
+        :return: QueryPlan
+        """
+        return self._memo('_table_query_plan',
+                          lambda: QueryPlan.from_serializer(self, self.table_layout.data_fields))
+
+    @property
+    def _readable_fields(self):
+        fields = super()._readable_fields
+        if self.table_fields_only:
+            data_fields = self.table_layout.data_fields
+            return [field for field in fields if field.field_name in data_fields]
+        return fields
+
     @property
     def filter_data(self):
         """
-        Returns serializer for filter row in table
-        :return:  Serializer
-        """
-        if not getattr(type(self), '_filter_data', None):
-            _filter_data = type(self)(instance=type(self).Meta.model())
-            _filter_data.serializer_type = 'filter'
-            for name, field in _filter_data.fields.fields.items():
-                if isinstance(field, ChoiceField):
-                    field.allow_blank = True
-            type(self)._filter_data = _filter_data
-        return type(self)._filter_data
+        Returns serializer for filter row in table. It is built once per serializer class (see build_filter_data) and is
+        shared by all requests and threads, so it must not be modified
+
+        :return: Serializer
+        """
+        res = type(self).__dict__.get('_filter_data', None)
+        if res is None:
+            with _filter_data_lock:
+                res = type(self).__dict__.get('_filter_data', None)
+                if res is None:
+                    res = self.build_filter_data()
+                    type(self)._filter_data = res
+        return res
+
+    def build_filter_data(self):
+        """
+        Builds serializer for filter row in table: a serializer for an empty record, with blank choices allowed
+
+        :return: Serializer
+        """
+        res = type(self)(instance=type(self).Meta.model())
+        res.serializer_type = 'filter'
+        for field in res.fields.values():
+            if isinstance(field, ChoiceField):
+                field.allow_blank = True
+        return res
+
+
+_filter_data_lock = threading.Lock()
+
+
+def _clone_field(field):
+    """
+    Returns a copy of prototype field, ready to be bound to a serializer instance.
+
+    Fields with state that is bound to them (child fields, nested serializers, defaults that get serializer context)
+    are cloned the DRF way (by re-instantiating them with original arguments). Others are shallow copied which is a lot
+    faster.
+    """
+    if (hasattr(field, 'child') or hasattr(field, 'child_relation') or isinstance(field, serializers.BaseSerializer) or
+            hasattr(getattr(field, 'default', None), 'set_context')):
+        return copy.deepcopy(field)
+
+    clone = copy.copy(field)
+    clone.style = dict(field.style)
+    clone.error_messages = dict(field.error_messages)
+    if '_validators' in field.__dict__:
+        # Validators with set_context (e.g. UniqueValidator) store serializer instance on themselves: each clone needs
+        # its own
+        clone._validators = [copy.copy(v) if hasattr(v, 'set_context') else v for v in field._validators]
+    if isinstance(field, ActionMixin):
+        clone.actions = list(field.actions)
+    if isinstance(field, UUIDMixIn):
+        clone._uuid = field._kwargs.get('uuid', None)
+    return clone
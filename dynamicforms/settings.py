@@ -10,6 +10,40 @@ TEMPLATE = getattr(s, MODULE_PREFIX + 'TEMPLATE', 'dynamicforms/bootstrap/')
 # PAGE_TEMPLATE specifies the basepage template to be used for TemplateHTMLRenderer
 PAGE_TEMPLATE = getattr(s, MODULE_PREFIX + 'PAGE_TEMPLATE', TEMPLATE + 'page.html')
 
+# ROW_CACHE specifies which of the configured django caches stores rendered table rows for serializers with row_cache
+ROW_CACHE = getattr(s, MODULE_PREFIX + 'ROW_CACHE', 'default')
+
+# COUNT_CACHE specifies which of the configured django caches stores record counts of paginated tables and
+# COUNT_CACHE_TIMEOUT for how many seconds they are kept
+COUNT_CACHE = getattr(s, MODULE_PREFIX + 'COUNT_CACHE', 'default')
+COUNT_CACHE_TIMEOUT = getattr(s, MODULE_PREFIX + 'COUNT_CACHE_TIMEOUT', 60)
+
+# TEMPLATE_CONTEXT_CACHE specifies which of the configured django caches stores template_context of viewsets that
+# declare template_context_timeout or template_context_models
+TEMPLATE_CONTEXT_CACHE = getattr(s, MODULE_PREFIX + 'TEMPLATE_CONTEXT_CACHE', 'default')
+
+# OPTIONS_INLINE_LIMIT: related fields with more options than this load them with select2 as the user types (requires
+# dynamicforms.urls), instead of rendering them all in the form. None renders options inline always.
+# OPTIONS_PAGE_SIZE is number of options loaded at a time
+OPTIONS_INLINE_LIMIT = getattr(s, MODULE_PREFIX + 'OPTIONS_INLINE_LIMIT', 100)
+OPTIONS_PAGE_SIZE = getattr(s, MODULE_PREFIX + 'OPTIONS_PAGE_SIZE', 30)
+
+# OPTIONS_KEY_MAX_AGE is number of seconds the signed key in URLs for loading options of related fields is valid
+OPTIONS_KEY_MAX_AGE = getattr(s, MODULE_PREFIX + 'OPTIONS_KEY_MAX_AGE', 24 * 60 * 60)
+
+# CHOICES_CACHE_MAX_SIZE is approximate number of bytes the choices of related fields with cache_choices may take in
+# memory of each process and CHOICES_CACHE_TIMEOUT for how many seconds they are kept
+CHOICES_CACHE_MAX_SIZE = getattr(s, MODULE_PREFIX + 'CHOICES_CACHE_MAX_SIZE', 10 * 1024 * 1024)
+CHOICES_CACHE_TIMEOUT = getattr(s, MODULE_PREFIX + 'CHOICES_CACHE_TIMEOUT', 300)
+
+# QUERY_BUDGET, when set, makes ModelViewSet fail list requests that execute more database queries than this. Meant for
+# development and tests, to catch serializers that query related records for each row
+QUERY_BUDGET = getattr(s, MODULE_PREFIX + 'QUERY_BUDGET', None)
+
+# UUID_STRATEGY specifies how ids of fields and serializers in rendered HTML are generated:
+# 'uuid1', 'counter', 'deterministic' or dotted path to a function taking the field / serializer and returning UUID
+UUID_STRATEGY = getattr(s, MODULE_PREFIX + 'UUID_STRATEGY', 'uuid1')
+
 
 # TEMPLATE_OPTIONS offers a chance to do some things in the template pack differently. It can be used for anything from
 # choosing version of the underlying framework (bootstrap 3 vs 4) or rendering various subsections differently
@@ -368,6 +368,57 @@ dynamicforms = {
     dynamicforms.form_helpers.set(formID, 'actions_' + fieldID, fieldActions);
   },
 
+  action_modules: {},
+
+  pending_form_actions: {},
+
+  /**
+   * Registers actions of a serializer class, compiled into a module (see ActionScript in mixins.py)
+   * @param moduleID: content hash of the module
+   * @param actions: list of [tracked field names, function]
+   */
+  registerActionModule: function registerActionModule(moduleID, actions) {
+    dynamicforms.action_modules[moduleID] = actions;
+    $.each(dynamicforms.pending_form_actions[moduleID] || [], function (idx, form) {
+      dynamicforms._bindFormActions(moduleID, form.formID, form.fieldIDs);
+    });
+    delete dynamicforms.pending_form_actions[moduleID];
+  },
+
+  /**
+   * Loads action module from its URL unless it is already loaded. Browser caches the module
+   * @param moduleID: content hash of the module
+   * @param url: module's URL
+   */
+  loadActionModule: function loadActionModule(moduleID, url) {
+    if (!dynamicforms.action_modules[moduleID])
+      $.ajax({url: url, dataType: 'script', cache: true});
+  },
+
+  /**
+   * Registers module's actions for a form. If module isn't loaded yet, actions are registered when it loads
+   * @param formID: id of form object
+   * @param moduleID: content hash of the module
+   * @param fieldIDs: object mapping names of tracked fields to their ids in this form
+   */
+  registerFormActions: function registerFormActions(formID, moduleID, fieldIDs) {
+    if (dynamicforms.action_modules[moduleID])
+      dynamicforms._bindFormActions(moduleID, formID, fieldIDs);
+    else {
+      var pending = dynamicforms.pending_form_actions[moduleID] || [];
+      pending.push({formID: formID, fieldIDs: fieldIDs});
+      dynamicforms.pending_form_actions[moduleID] = pending;
+    }
+  },
+
+  _bindFormActions: function _bindFormActions(moduleID, formID, fieldIDs) {
+    $.each(dynamicforms.action_modules[moduleID], function (idx, action) {
+      $.each(action[0], function (idx, fieldName) {
+        dynamicforms.registerFieldAction(formID, fieldIDs[fieldName], action[1]);
+      });
+    });
+  },
+
   /**
    * Registers the function which will get current field's value. See "standard" fieldGetValue below
    * @param formID: id of form object
@@ -637,6 +688,23 @@ dynamicforms = {
     dynamicforms.paginatorGetNextPage(formID, filter);
   },
 
+  /**
+   * Sets values of filter row fields, e.g. to filters applied to the rendered table
+   *
+   * @param filterRowID: id of filter row
+   * @param values: field name -> value
+   */
+  setFilterValues: function setFilterValues(filterRowID, values) {
+    var $row = $("#" + filterRowID);
+    $.each(values, function (name, value) {
+      var element = $row.find("[name='" + name + "']");
+      if (element.attr('type') == 'checkbox')
+        element.prop({checked: value == 'true', readOnly: false, indeterminate: false});
+      else
+        element.val(value).trigger('change.select2');
+    });
+  },
+
   /**
    * "Standard" function which is called after filter button in header is clicked.
    * It finds id of table object and calls filterData function with it.
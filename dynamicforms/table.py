@@ -0,0 +1,69 @@
+import re
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Tuple
+
+from .action import Action
+
+
+# References to row fields in action templates: {{ row.field }} or {{ row|dict_item:'field' }}
+_row_reference = re.compile(r'\brow(?:\.|\|dict_item:[\'"]?)(\w+)')
+
+
+class TableLayout(NamedTuple):
+    """
+    Describes how a serializer is rendered in table view: which columns are shown and where the action controls go.
+
+    The layout only depends on serializer declaration so it is computed once per serializer class (see
+    ModelSerializer.table_layout) and then shared by all of its instances.
+    """
+
+    columns: Tuple[str, ...]  #: names of visible columns, in order of appearance
+    headers: Tuple[str, ...]  #: column header labels, matching columns
+    actions: Mapping[str, Tuple[Action, ...]]  #: position -> actions declared for that position
+    field_actions: Mapping[Tuple[str, str], Tuple[Action, ...]]  #: (position, field_name) -> actions for the field
+    columns_count: int  #: number of all columns, including control columns
+    data_fields: Tuple[str, ...]  #: fields a table row needs: columns, primary key and fields referenced by actions
+
+    @classmethod
+    def from_serializer(cls, serializer):
+        """
+        Computes table layout for given serializer
+
+        :param serializer: Serializer
+        :return: TableLayout
+        """
+        fields = [f for f in serializer.fields.values() if f.visible_in_table and not f.write_only]
+
+        actions, field_actions = {}, {}
+        for action in serializer.controls.actions:
+            actions.setdefault(action.position, []).append(action)
+            if action.field_name is not None:
+                field_actions.setdefault((action.position, action.field_name), []).append(action)
+
+        columns = tuple(f.field_name for f in fields)
+        referenced = {name for action in serializer.controls.actions for name in _row_reference.findall(action.action)}
+        pk = serializer.Meta.model._meta.pk.name if hasattr(getattr(serializer, 'Meta', None), 'model') else 'id'
+        data_fields = columns + tuple(
+            name for name in serializer.fields if name not in columns and name in referenced | {'id', pk}
+        )
+
+        return cls(
+            columns=columns,
+            headers=tuple(f.label for f in fields),
+            actions=MappingProxyType({k: tuple(v) for k, v in actions.items()}),
+            field_actions=MappingProxyType({k: tuple(v) for k, v in field_actions.items()}),
+            columns_count=len(fields) + (1 if 'rowstart' in actions else 0) + (1 if 'rowend' in actions else 0),
+            data_fields=data_fields,
+        )
+
+    def position_actions(self, position: str, field_name: str = None) -> Tuple[Action, ...]:
+        """
+        Returns actions for the given position
+
+        :param position: Position of command (See action.py->Action for more details)
+        :param field_name: If given, only actions declared for this field are returned
+        :return: tuple of actions
+        """
+        if field_name is None:
+            return self.actions.get(position, ())
+        return self.field_actions.get((position, field_name), ())
@@ -1,10 +1,16 @@
 import json as jsonlib
 
 from django import template
+from django.template.base import render_value_in_context
+from django.utils.html import conditional_escape
 from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from rest_framework.relations import RelatedField
 from rest_framework.templatetags import rest_framework as drftt
 from rest_framework.utils.encoders import JSONEncoder
 
+from .. import settings
+from ..cache import RowCache, filter_row_html
 from ..renderers import HTMLFormRenderer
 from ..struct import Struct
 
@@ -17,6 +23,15 @@ def dict_item(d, k):
     return d[k]
 
 
+@register.filter
+def selected_options(field, value):
+    """
+    Returns option for field's current value, for related fields that load their options with select2 (see
+    RelatedOptionsMixin.selected_options)
+    """
+    return field.selected_options(value)
+
+
 # just copy the template tags that are the same as we're not redeclaring them
 # TODO: the following DRF filters pending removal?
 # note that simply copying the filters didn't work: django kept complaining about parameters. So now it's verbatim copy
@@ -81,6 +96,65 @@ def render_form(serializer, form_template=None):
     return renderer.render(serializer.data, None, {'style': style})
 
 
+@register.simple_tag(takes_context=True)
+def render_filter_row(context, serializer):
+    """
+    Renders filter row of the table (base_table_filter.html). The row itself is rendered once and cached (see
+    cache.filter_row_html): filter values applied to the request being rendered are then set by a short script.
+
+    .. code-block:: django
+
+       {% render_filter_row serializer %}
+
+    :param context: template context
+    :param serializer: Serializer of the table
+    :return: rendered filter row
+    """
+    form = serializer.filter_data
+    template = settings.TEMPLATE + 'base_table_filter.html'
+    models = set()
+    for field in form.fields.values():
+        field = getattr(field, 'child_relation', field)
+        if isinstance(field, RelatedField) and getattr(field, 'queryset', None) is not None:
+            models.add(field.queryset.model)
+    html = filter_row_html(type(serializer), template, models, lambda: render_form(form, template))
+
+    request = getattr(context, 'request', None)
+    values = {name: value for name, value in request.GET.items() if value and name in form.fields} if request else {}
+    if values:
+        # Values come from the request: keep them from closing the script tag
+        values = jsonlib.dumps(values).replace('<', '\\u003C').replace('>', '\\u003E').replace('&', '\\u0026')
+        html += '<script type="application/javascript">dynamicforms.setFilterValues("%s", %s);</script>' % (
+            form.uuid, values
+        )
+    return mark_safe(html)
+
+
+@register.simple_tag
+def register_form_actions(serializer):
+    """
+    Registers form's actions using actions of serializer's class compiled into a JavaScript module (see
+    mixins.ActionScript). The module is loaded from its URL, which browsers cache, and only once per page. The form
+    passes just the ids of its tracked fields. Renders the module inline when dynamicforms.urls are not included.
+
+    .. code-block:: django
+
+       <script type="application/javascript">
+         {% register_form_actions serializer %}
+       </script>
+
+    :param serializer: Serializer of the form. Its action_script must not be None
+    :return: JavaScript code
+    """
+    script = serializer.action_script
+    url = script.url
+    field_ids = {name: str(serializer.fields[name].uuid) for name in script.field_names}
+    res = 'dynamicforms.loadActionModule("%s", %s);\n' % (script.hash, jsonlib.dumps(url)) if url else script.script
+    res += 'dynamicforms.registerFormActions("%s", "%s", %s);' % (serializer.uuid, script.hash,
+                                                                   jsonlib.dumps(field_ids))
+    return mark_safe(res)
+
+
 @register.simple_tag
 def render_field(field, style):
     """
@@ -128,45 +202,36 @@ def table_columns_count(serializer):
     :param serializer: Serializer
     :return: Number of all columns
     """
-    actions = serializer.controls.actions
+    return serializer.table_layout.columns_count
 
-    return (len([f for f in serializer.fields.values() if f.visible_in_table])
-            + (1 if any(action.position == "rowend" for action in actions) else 0)
-            + (1 if any(action.position == "rowstart" for action in actions) else 0))
 
-
-@register.simple_tag(takes_context=True)
-def render_table_commands(context, serializer, position, field_name=None, table_header=None):
+def _table_commands_source(serializer, position, field_name=None, table_header=None):
     """
-    Renders commands that are defined in serializers controls attribute.
+    Builds template source for commands that are defined in serializers controls attribute.
 
-    :param context: Context
-    :param serializer: Serializer
-    :param position: Position of command (See action.py->Action for more details)
-    :param field_name: If position is left or right to the field, then this parameter must contain field name
-    :param table_header: Name of table header for column, fo commands. Only for row start and row end position.
-    :return: rendered command buttons. If table_header parameter is given and commands for position are defined,
-        returns only rendered table header
+    Serializer's uuid is not included literally, but as {{ serializer.uuid }} so that the source (and the template
+    compiled from it) can be shared between all instances of the serializer class.
     """
     ret = rowclick = rowrclick = ''
     stop_propagation = 'if(event.stopPropagation){event.stopPropagation();}event.cancelBubble=true;'
 
-    for action in serializer.controls.actions:
-        if action.position != position and not \
-                (position == 'onrowclick' and action.position in ('rowclick', 'rowrightclick')):
-            continue
+    layout = serializer.table_layout
+    if position == 'onrowclick':
+        actions = layout.position_actions('rowclick') + layout.position_actions('rowrightclick')
+    else:
+        actions = layout.position_actions(position, field_name)
 
+    for action in actions:
         if position == 'onrowclick':
             if action.position == 'rowclick':
                 rowclick = action.action
             elif action.position == 'rowrightclick':
                 rowrclick = action.action
         else:
-            if field_name is None or (action.field_name == field_name):
-                ret += '<button class="btn btn-info" onClick="{stop_propagation} {action}">' \
-                       '{icon_def}{label}</button>'. \
-                    format(stop_propagation=stop_propagation, action=action.action, label=action.label,
-                           icon_def='<img src="{icon}"/>'.format(icon=action.icon) if action.icon else '')
+            ret += '<button class="btn btn-info" onClick="{stop_propagation} {action}">' \
+                   '{icon_def}{label}</button>'. \
+                format(stop_propagation=stop_propagation, action=action.action, label=action.label,
+                       icon_def='<img src="{icon}"/>'.format(icon=action.icon) if action.icon else '')
 
     if ret != '':
         if 'rowclick' not in position:
@@ -184,15 +249,159 @@ def render_table_commands(context, serializer, position, field_name=None, table_
         if rowclick != '':
             ret += "$('#list-{uuid}').find('tbody').click(" \
                    "function(event) {{ \n{stop_propagation} \n{action} \nreturn false;\n}});\n". \
-                format(stop_propagation=stop_propagation, action=rowclick, uuid=serializer.uuid)
+                format(stop_propagation=stop_propagation, action=rowclick, uuid='{{ serializer.uuid }}')
         if rowrclick != '':
             ret += "$('#list-{uuid}').find('tbody').contextmenu(" \
                    "function(event) {{ \n{stop_propagation} \n{action} \nreturn false;\n}});\n". \
-                format(stop_propagation=stop_propagation, action=rowrclick, uuid=serializer.uuid)
+                format(stop_propagation=stop_propagation, action=rowrclick, uuid='{{ serializer.uuid }}')
         if ret != '':
             ret = '<script type="application/javascript">%s</script>' % ret
 
-    return mark_safe(context.template.engine.from_string(ret).render(context))
+    return ret
+
+
+# Compiled templates for render_table_commands: (serializer class, position, field_name, table_header, language) ->
+#   Template or None when there are no commands to render for the given position
+_table_commands_templates = {}
+
+
+@register.simple_tag(takes_context=True)
+def render_table_commands(context, serializer, position, field_name=None, table_header=None):
+    """
+    Renders commands that are defined in serializers controls attribute.
+
+    Commands are compiled into a template only once per serializer class, position, field and active language. All
+    subsequent calls only render the compiled template.
+
+    :param context: Context
+    :param serializer: Serializer
+    :param position: Position of command (See action.py->Action for more details)
+    :param field_name: If position is left or right to the field, then this parameter must contain field name
+    :param table_header: Name of table header for column, fo commands. Only for row start and row end position.
+    :return: rendered command buttons. If table_header parameter is given and commands for position are defined,
+        returns only rendered table header
+    """
+    key = (type(serializer), position, field_name, table_header, get_language())
+    try:
+        template = _table_commands_templates[key]
+    except KeyError:
+        source = _table_commands_source(serializer, position, field_name, table_header)
+        template = context.template.engine.from_string(source) if source else None
+        _table_commands_templates[key] = template
+
+    if template is None:
+        return ''
+    with context.push(serializer=serializer):
+        return mark_safe(template.render(context))
+
+
+def _build_table_rows_renderer(serializer):
+    """
+    Builds a function that renders table rows for given serializer class. The function's output is identical to that
+    of base_table_body.html, but it doesn't dispatch template nodes for every row and cell: everything that only depends
+    on serializer declaration (visible columns, which action commands exist, static markup) is resolved here, once.
+
+    :param serializer: Serializer
+    :return: function(context, serializer, data) -> str
+    """
+    layout = serializer.table_layout
+    has_rowstart = 'rowstart' in layout.actions
+    has_rowend = 'rowend' in layout.actions
+    columns = tuple(
+        (key,
+         '\n        \n          <td %%s data-name="%s">\n            ' % conditional_escape(key),
+         ('fieldleft', key) in layout.field_actions,
+         ('fieldright', key) in layout.field_actions)
+        for key in layout.columns
+    )
+
+    def render_row(context, serializer, row, cells):
+        # Renders everything in the row after its opening <tr> tag. cells are field values, already rendered for table
+        res = []
+        if has_rowstart:
+            res.append(render_table_commands(context, serializer, 'rowstart'))
+        res.append('\n      ')
+        for (key, td_start, has_left, has_right), rendered in zip(columns, cells):
+            value = row[key]
+            res.append(td_start % render_value_in_context(drftt.add_nested_class(value), context))
+            if has_left or has_right:
+                with context.push(key=key, value=value):
+                    left = render_table_commands(context, serializer, 'fieldleft', key) if has_left else ''
+                    right = render_table_commands(context, serializer, 'fieldright', key) if has_right else ''
+            else:
+                left = right = ''
+            res.append('%s\n            %s\n            %s\n          </td>\n      ' % (
+                left, conditional_escape(rendered) if context.autoescape else rendered, right
+            ))
+        res.append('\n      ')
+        if has_rowend:
+            res.append(render_table_commands(context, serializer, 'rowend'))
+        res.append('\n    </tr>\n  ')
+        return ''.join(res)
+
+    def render_rows(context, serializer, data):
+        fields = [serializer.fields[column[0]] for column in columns]
+        first_row_attrs = 'data-next="%s" data-previous="%s" ' % (
+            render_value_in_context(context.get('link_next', ''), context),
+            render_value_in_context(context.get('link_prev', ''), context),
+        )
+        row_cache = None
+        if serializer.row_cache:
+            # Rows contain action URLs of the viewset rendering them
+            request = getattr(context, 'request', None)
+            row_cache = RowCache(type(serializer), '%s:%s' % (context.get('url_reverse', ''),
+                                                              request.path if request is not None else ''))
+        cached = row_cache.get_many([row.get('id', None) for row in data]) if row_cache else {}
+        rendered = {}
+
+        # Field values are rendered a column at a time, only for rows that weren't found in cache
+        uncached = [row for row in data if row.get('id', None) not in cached]
+        cells = iter(zip(*(
+            field.render_to_table_column([row[column[0]] for row in uncached], uncached)
+            for column, field in zip(columns, fields)
+        )))
+
+        res = ['\n\n  ']
+        for idx, row in enumerate(data):
+            pk = row.get('id', None)
+            res.append('\n    <tr data-id="%s" %s>\n      ' % (
+                render_value_in_context(row.get('id', ''), context), first_row_attrs if idx == 0 else ''
+            ))
+            fragment = cached.get(pk, None)
+            if fragment is None:
+                with context.push(row=row):
+                    fragment = render_row(context, serializer, row, next(cells, ()))
+                if pk is not None:
+                    rendered[pk] = fragment
+            res.append(fragment)
+        res.append('\n')
+        if row_cache and rendered:
+            row_cache.set_many(rendered)
+        return ''.join(res)
+
+    return render_rows
+
+
+# Table rows renderers for serializers that declare use_row_renderer: serializer class -> function
+_table_rows_renderers = {}
+
+
+@register.simple_tag(takes_context=True)
+def render_table_rows(context, serializer, data):
+    """
+    Renders table rows for given data with a function specialised for serializer's class. The function is built on
+    first use. Output is the same as when rendering base_table_body.html template.
+
+    :param context: Context
+    :param serializer: Serializer
+    :param data: list of records to render
+    :return: rendered table rows
+    """
+    renderer = _table_rows_renderers.get(type(serializer), None)
+    if renderer is None:
+        renderer = _build_table_rows_renderer(serializer)
+        _table_rows_renderers[type(serializer)] = renderer
+    return mark_safe(renderer(context, serializer, data))
 
 
 @register.simple_tag(takes_context=True)
@@ -0,0 +1,10 @@
+from django.conf.urls import url
+
+from .views import action_script, RelatedOptionsView
+
+app_name = 'dynamicforms'
+
+urlpatterns = [
+    url(r'^related-options/$', RelatedOptionsView.as_view(), name='related-options'),
+    url(r'^actions/(?P<script_hash>[0-9a-f]+)\.js$', action_script, name='action-script'),
+]
@@ -1,3 +1,91 @@
-from django.shortcuts import render
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .mixins import ActionScript, RelatedOptionsMixin
+
+
+class RelatedOptionsView(APIView):
+    """
+    Serves options of related fields to select2 (see mixins.RelatedOptionsMixin)
+
+    Query parameters: field (signed key from field's options_url), term (text the user typed) and cursor (from previous
+    page). Response: {"results": [{"id": value, "text": label}, ...], "cursor": next page cursor or null}
+
+    Request must pass permissions of the viewset that rendered the field, as if it asked for the form. When no viewset
+    rendered it (e.g. in a table's filter row), it must pass permission_classes of this view instead.
+    """
+
+    renderer_classes = (JSONRenderer,)
+    permission_classes = (IsAuthenticated,)
+    owner_view = None  #: viewset that rendered the field, set up as if it was serving the request (see initial)
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Key is loaded before the request is initialized: the request must be authenticated as the viewset would do it
+        try:
+            self.serializer_class, self.field_name, self.view_class = RelatedOptionsMixin.load_key(
+                request.GET.get('field', '')
+            )
+        except (signing.BadSignature, ImportError, TypeError, ValueError):
+            self.serializer_class = self.field_name = self.view_class = None
+        return super().initialize_request(request, *args, **kwargs)
+
+    def get_authenticators(self):
+        if self.view_class is not None:
+            return self.view_class().get_authenticators()
+        return super().get_authenticators()
+
+    def initial(self, request, *args, **kwargs):
+        if self.serializer_class is None:
+            raise NotFound()
+        if self.view_class is not None:
+            self.owner_view = self.view_class(action=None, request=request, args=(), kwargs={}, format_kwarg=None,
+                                              render_type='form')
+        super().initial(request, *args, **kwargs)
+
+    def check_permissions(self, request):
+        if self.owner_view is None:
+            return super().check_permissions(request)
+        self.owner_view.check_permissions(request)
+
+    def get(self, request, *args, **kwargs):
+        context = dict(request=request, view=self.owner_view)
+        try:
+            field = RelatedOptionsMixin.from_serializer(self.serializer_class, self.field_name, context)
+        except (KeyError, TypeError):
+            raise NotFound()
+        try:
+            results, cursor = field.options_page(request.query_params.get('term', ''),
+                                                 request.query_params.get('cursor', None))
+        except ValidationError:
+            raise NotFound('Invalid cursor')
+        return Response(dict(results=results, cursor=cursor))
+
+
+@require_GET
+def action_script(request, script_hash):
+    """
+    Serves actions of a serializer class compiled into a JavaScript module (see mixins.ActionScript)
+
+    Query parameter s is the signed serializer class path. URL includes the script's content hash, so the script can
+    be cached by browsers indefinitely. If serializer's actions changed since the URL was rendered, current script is
+    served, but is not cached.
+    """
+    try:
+        script = ActionScript.from_key(request.GET.get('s', ''), dict(request=request))
+    except (signing.BadSignature, ImportError, TypeError, ValueError):
+        raise Http404()
+    if script is None:
+        raise Http404()
+    res = HttpResponse(script.script, content_type='application/javascript; charset=utf-8')
+    if script.hash == script_hash:
+        res['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        res['Cache-Control'] = 'no-cache'
+    return res
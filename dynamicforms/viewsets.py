@@ -1,17 +1,30 @@
-from datetime import datetime
-
-import pytz
-from django.conf import settings
-from django.db import models
-from django.http import Http404
-from rest_framework import status, viewsets
+import copy
+import hashlib
+import json
+from typing import Iterable, List, Optional
+
+from django.db import DatabaseError, connection, connections, router, transaction
+from django.db.models import Count, DecimalField, FloatField, IntegerField, Max, Sum
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import exceptions, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import GenericAPIView
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from rest_framework.serializers import ListSerializer
+from rest_framework.serializers import ListSerializer, ModelSerializer
 from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 
 from dynamicforms.settings import TEMPLATE
+from .cache import cached_template_context, records_changed
+from .filters import FilterPlan
+from .query import QueryPlan
 from .renderers import TemplateHTMLRenderer
-from .settings import BSVER_MODAL
+from .settings import BSVER_MODAL, QUERY_BUDGET
 
 
 class NewMixin(object):
@@ -21,6 +34,12 @@ class NewMixin(object):
     Caution: Do not use directly. This is only a mixin and is used in final ViewSet derivatives.
     """
 
+    cache_new_object = False
+    """
+    When True, new_object is only called once per viewset class and each request gets a copy of that record. Only
+    enable when new_object's result doesn't depend on the request or current time (e.g. a default=timezone.now field)
+    """
+
     def new_object(self: viewsets.ModelViewSet):
         """
         Returns a new model instance. If you need it pre-populated with default values, this is the method to override.
@@ -36,19 +55,277 @@ class NewMixin(object):
         # If we do not, subsequent validation may fail because a hidden field has a value
         return self.get_queryset().model()
 
+    def get_new_object(self: viewsets.ModelViewSet):
+        """
+        Returns record with default values for the "new" record, see new_object and cache_new_object
+
+        :return: model instance
+        """
+        if not self.cache_new_object:
+            return self.new_object()
+        prototype = type(self).__dict__.get('_new_object_prototype', None)
+        if prototype is None:
+            prototype = self.new_object()
+            type(self)._new_object_prototype = prototype
+        return copy.deepcopy(prototype)
+
     # noinspection PyUnresolvedReferences
     def retrieve(self: viewsets.ModelViewSet, request, *args, **kwargs):
-        try:
-            return super().retrieve(request, *args, **kwargs)
-        except Http404:
-            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
-            filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
-            if filter_kwargs.get('pk', None) == 'new':
-                instance = self.new_object()
-                serializer = self.get_serializer(instance)
-                return Response(serializer.data)
+        # "new" is never a record in the database: don't look for it there
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if self.lookup_field == 'pk' and self.kwargs.get(lookup_url_kwarg, None) == 'new':
+            serializer = self.get_serializer(self.get_new_object())
+            return Response(serializer.data)
+        return super().retrieve(request, *args, **kwargs)
+
+
+class BulkMixin(object):
+    """
+    Provides bulk create, update and delete of records on the "bulk" URL of the viewset (e.g. /my-model/bulk/):
+
+    * POST a list of records to create them
+    * PATCH a list of {"pk": ..., "changes": {...}} to update records
+    * DELETE with a list of primary keys (or {"pk": [...]}) as body or with filters as query parameters
+
+    Each record is validated by the viewset's serializer, same as for single-record operations. Records are then saved
+    with bulk_create / bulk_update / delete, bulk_chunk_size records at a time, all in one transaction: if any of the
+    records fails, nothing is saved. Response contains a result (pk or errors) for each of the records. With ?stream=1
+    results are streamed, one JSON object per line, followed by a line with {"committed": true | false}.
+
+    bulk_create and bulk_update send no post_save signals, so caches of the model's records (see cache.records_changed)
+    are dropped explicitly after each chunk. When the viewset overrides perform_create / perform_update /
+    perform_destroy or the serializer overrides create / update, records are saved one at a time through them instead.
+    So are created records when the database can't return primary keys from bulk_create.
+
+    Bulk operations are opt-in: mix BulkMixin into the viewset, before ModelViewSet::
+
+       class MyViewSet(BulkMixin, ModelViewSet):
+           ...
+
+    Bulk operations don't go through the viewset's create / update / partial_update / destroy / get_object. They are
+    refused (405) when the viewset overrides the ones the operation would bypass.
+    """
+
+    bulk_chunk_size = 500  #: number of records validated and saved at a time by bulk operations
+
+    # Single-record methods each bulk operation bypasses: (method name, class providing the stock implementation)
+    _bulk_bypassed = dict(
+        post=(('create', mixins.CreateModelMixin),),
+        patch=(('update', mixins.UpdateModelMixin), ('partial_update', mixins.UpdateModelMixin),
+               ('get_object', GenericAPIView)),
+        delete=(('destroy', mixins.DestroyModelMixin), ('get_object', GenericAPIView)),
+    )
+
+    # noinspection PyUnresolvedReferences
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk', renderer_classes=(JSONRenderer,))
+    def bulk(self: viewsets.ModelViewSet, request, *args, **kwargs):
+        method = request.method.lower()
+        for name, base in self._bulk_bypassed[method]:
+            if self._overrides(self, name, base):
+                raise exceptions.MethodNotAllowed(
+                    request.method, '%s overrides %s, which bulk operations would bypass' % (type(self).__name__, name)
+                )
+        if method == 'delete':
+            items = self.bulk_delete_targets(request)
+            process = self.bulk_delete_chunk
+        else:
+            items = request.data
+            if not isinstance(items, list):
+                raise exceptions.ValidationError('Expected a list of records')
+            process = self.bulk_create_chunk if method == 'post' else self.bulk_update_chunk
+
+        results = self.bulk_results(items, process)
+        if request.query_params.get('stream', None) in ('1', 'true'):
+            return StreamingHttpResponse(
+                (json.dumps(result, cls=DjangoJSONEncoder) + '\n' for result in results),
+                content_type='application/x-ndjson'
+            )
+        results = list(results)
+        committed = results.pop()['committed']
+        return Response(dict(committed=committed, results=results),
+                        status=status.HTTP_200_OK if committed else status.HTTP_400_BAD_REQUEST)
+
+    def bulk_results(self, items: List, process):
+        """
+        Processes items in chunks of bulk_chunk_size in one transaction, rolling it back if any of them failed
+
+        :param items: list of items as sent by the client
+        :param process: function(start index, chunk of items, whether to save) returning list of results
+        :return: generator of results, one per item, followed by {"committed": bool}. When saving a chunk fails with a
+           database error, all items of the chunk get an error
+        """
+        failed = False
+        with transaction.atomic():
+            for start in range(0, len(items), self.bulk_chunk_size):
+                chunk = items[start:start + self.bulk_chunk_size]
+                try:
+                    # Savepoint: after a database error the transaction can still be used to validate other chunks
+                    with transaction.atomic():
+                        # After a failure records are still validated, but there's no point in saving them
+                        results = process(start, chunk, not failed)
+                except DatabaseError:
+                    # E.g. an IntegrityError for duplicates within the chunk, which per-record validation can't see
+                    results = [dict(index=idx, errors=['Chunk could not be saved.'])
+                               for idx in range(start, start + len(chunk))]
+                failed = failed or any('errors' in result for result in results)
+                yield from results
+            if failed:
+                transaction.set_rollback(True)
+        yield dict(committed=not failed)
+
+    @staticmethod
+    def _overrides(obj, name: str, base) -> bool:
+        return getattr(type(obj), name) is not getattr(base, name)
+
+    @staticmethod
+    def _m2m_names(model) -> set:
+        return {f.name for f in model._meta.get_fields() if f.many_to_many or f.one_to_many}
+
+    # noinspection PyUnresolvedReferences
+    def bulk_create_chunk(self: viewsets.ModelViewSet, start: int, items: List, save: bool) -> List[dict]:
+        serializers = [self.get_serializer(data=item) for item in items]
+        results = [
+            dict(index=idx) if serializer.is_valid() else dict(index=idx, errors=serializer.errors)
+            for idx, serializer in enumerate(serializers, start)
+        ]
+        if not save or any('errors' in result for result in results):
+            return results
+
+        model = self.get_queryset().model
+        features = connections[router.db_for_write(model)].features
+        # Without these, bulk_create doesn't set primary keys of created records (e.g. SQLite on Django < 4)
+        returns_pks = getattr(features, 'can_return_rows_from_bulk_insert', False) or \
+            getattr(features, 'can_return_ids_from_bulk_insert', False)
+        if not returns_pks or self._overrides(self, 'perform_create', mixins.CreateModelMixin) or \
+                self._overrides(serializers[0], 'create', ModelSerializer):
+            for result, serializer in zip(results, serializers):
+                self.perform_create(serializer)
+                result['pk'] = serializer.instance.pk
+            return results
+
+        related = self._m2m_names(model)
+        plain = [(result, s) for result, s in zip(results, serializers) if not related.intersection(s.validated_data)]
+        instances = model._default_manager.bulk_create(
+            [model(**s.validated_data) for _, s in plain], batch_size=self.bulk_chunk_size
+        )
+        for (result, _), instance in zip(plain, instances):
+            result['pk'] = instance.pk
+        for result, serializer in zip(results, serializers):
+            if related.intersection(serializer.validated_data):
+                # Related records are set by the serializer, after the record is saved
+                result['pk'] = serializer.save().pk
+        records_changed(model, [instance.pk for instance in instances])
+        return results
+
+    # noinspection PyUnresolvedReferences
+    def bulk_instances(self: viewsets.ModelViewSet, queryset, pks: List, results: List[dict]) -> List:
+        """
+        Loads records with given primary keys, checking object permissions. Errors are added to corresponding results
+
+        :param queryset: Queryset to load the records from
+        :param pks: primary keys as sent by the client
+        :param results: result for each of the primary keys
+        :return: record (or None in case of error) for each of the primary keys
+        """
+        pk_field = queryset.model._meta.pk
+        keys = []
+        for pk in pks:
+            try:
+                keys.append(pk_field.to_python(pk))
+            except (TypeError, DjangoValidationError):
+                keys.append(None)
+        instances = queryset.in_bulk([key for key in keys if key is not None])
+        res = []
+        for key, result in zip(keys, results):
+            instance = instances.get(key, None)
+            if instance is None:
+                result['errors'] = ['Not found.']
             else:
-                raise
+                try:
+                    self.check_object_permissions(self.request, instance)
+                except exceptions.APIException as e:
+                    result['errors'] = [e.detail]
+                    instance = None
+            res.append(instance)
+        return res
+
+    # noinspection PyUnresolvedReferences
+    def bulk_update_chunk(self: viewsets.ModelViewSet, start: int, items: List, save: bool) -> List[dict]:
+        valid = [isinstance(item, dict) and isinstance(item.get('changes', None), dict) for item in items]
+        results = [dict(index=idx, pk=item.get('pk', None) if ok else None) for idx, (item, ok) in
+                   enumerate(zip(items, valid), start)]
+        queryset = self.get_queryset()
+        instances = self.bulk_instances(queryset, [result['pk'] for result in results], results)
+
+        changed = []
+        for item, ok, instance, result in zip(items, valid, instances, results):
+            if not ok:
+                result['errors'] = ['Expected {"pk": ..., "changes": {...}}']
+            elif instance is not None:
+                serializer = self.get_serializer(instance, data=item['changes'], partial=True)
+                if serializer.is_valid():
+                    changed.append((instance, serializer))
+                else:
+                    result['errors'] = serializer.errors
+
+        if not save or not changed or any('errors' in result for result in results):
+            return results
+        if self._overrides(self, 'perform_update', mixins.UpdateModelMixin) or \
+                self._overrides(changed[0][1], 'update', ModelSerializer):
+            for _, serializer in changed:
+                self.perform_update(serializer)
+            return results
+
+        related, fields = self._m2m_names(queryset.model), set()
+        for instance, serializer in changed:
+            for attr, value in serializer.validated_data.items():
+                if attr in related:
+                    getattr(instance, attr).set(value)
+                else:
+                    setattr(instance, attr, value)
+                    fields.add(attr)
+        if fields:
+            queryset.model._default_manager.bulk_update(
+                [instance for instance, _ in changed], sorted(fields), batch_size=self.bulk_chunk_size
+            )
+        records_changed(queryset.model, [instance.pk for instance, _ in changed])
+        return results
+
+    # noinspection PyUnresolvedReferences
+    def bulk_delete_targets(self: viewsets.ModelViewSet, request) -> List:
+        """
+        Returns primary keys of records to delete: those listed in request body or, when there are none, those matching
+        filters given in query parameters. Without either, nothing is deleted
+
+        :param request: Request
+        :return: list of primary keys
+        """
+        pks = request.data.get('pk', None) if isinstance(request.data, dict) else request.data
+        if pks:
+            if not isinstance(pks, list):
+                raise exceptions.ValidationError('Expected a list of primary keys')
+            return pks
+        queryset = self.filter_queryset(super().get_queryset())
+        if not queryset.query.where:
+            raise exceptions.ValidationError('Give primary keys or filters of records to delete')
+        return list(queryset.values_list('pk', flat=True))
+
+    # noinspection PyUnresolvedReferences
+    def bulk_delete_chunk(self: viewsets.ModelViewSet, start: int, items: List, save: bool) -> List[dict]:
+        results = [dict(index=idx, pk=pk) for idx, pk in enumerate(items, start)]
+        queryset = self.filter_queryset(super().get_queryset())
+        instances = self.bulk_instances(queryset, items, results)
+        if not save or any('errors' in result for result in results):
+            return results
+        if self._overrides(self, 'perform_destroy', mixins.DestroyModelMixin):
+            for instance in instances:
+                self.perform_destroy(instance)
+            return results
+        pks = [instance.pk for instance in instances]
+        queryset.model._default_manager.filter(pk__in=pks).delete()
+        # Queryset delete skips signals when the model has no cascades or signal receivers of its own
+        records_changed(queryset.model, pks)
+        return results
 
 
 class ModelViewSet(NewMixin, viewsets.ModelViewSet):
@@ -84,9 +361,44 @@ class ModelViewSet(NewMixin, viewsets.ModelViewSet):
     
        def template_context(self):
            return dict(items=MyModel.objects.all())
+
+    A callable template_context is called once per request, no matter how many times the response is rendered. To
+    share its result among requests, declare template_context_timeout and / or template_context_models.
     """
 
+    template_context_timeout = None
+    """
+    Number of seconds result of callable template_context is cached for (see cache.cached_template_context). When
+    None, it is only cached if template_context_models are given and is then kept until one of those models changes
+    """
+    template_context_models = ()  #: models whose saved or deleted records invalidate cached template_context
+
     template_name = TEMPLATE + 'base_list.html'  #: template filename for listing multiple records (html renderer)
+    prune_table_columns = False
+    """
+    When rendering a table, only serialize and load fields that the table needs (see TableLayout.data_fields). Only
+    enable when no render_to_table override or custom table template reads other fields of the row
+    """
+    select_related = None  #: relations for queryset.select_related. When None, they are derived from the serializer
+    prefetch_related = None  #: relations for queryset.prefetch_related. When None, they are derived from the serializer
+    query_budget = None  #: max queries a list request may do. Defaults to DYNAMICFORMS_QUERY_BUDGET setting
+    rejected_filters = ()  #: query parameters that filter_queryset could not apply (not a field or invalid value)
+
+    etag_field = None
+    """
+    Name of a model field whose value increases whenever a record changes: a version counter (integer field) or last
+    modification timestamp (e.g. DateTimeField with auto_now). When set, list and retrieve responses carry an ETag and
+    requests with a matching If-None-Match header are answered with 304 Not Modified without serializing or rendering
+    anything. See get_etag
+    """
+    etag = None  #: ETag of the current response, if any
+
+    streaming_chunk_size = None
+    """
+    When set, unpaginated lists rendered as 'table' or 'table rows' are streamed to the client: table head is sent
+    immediately, followed by table rows rendered in chunks of this many records as they are read from the database.
+    Memory use and time to first byte then no longer grow with the number of records.
+    """
 
     # noinspection PyAttributeOutsideInit
     def initialize_request(self, request, *args, **kwargs):
@@ -103,10 +415,125 @@ class ModelViewSet(NewMixin, viewsets.ModelViewSet):
             request.method = request.POST.get('data-dynamicforms-method')
         return super().initialize_request(request, *args, **kwargs)
 
+    def dispatch(self, request, *args, **kwargs):
+        budget = self.query_budget if self.query_budget is not None else QUERY_BUDGET
+        if budget is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = super().dispatch(request, *args, **kwargs)
+            is_list = getattr(self, 'action', None) == 'list'
+            if is_list and hasattr(response, 'render'):
+                response.render()
+        assert not is_list or len(queries) <= budget, \
+            'Listing %s did %d queries, query budget is %d:\n%s' % (
+                type(self).__name__, len(queries), budget, '\n'.join(q['sql'] for q in queries.captured_queries)
+            )
+        return response
+
+    def get_etag(self, request) -> Optional[str]:
+        """
+        Computes a validator for the response to the request, querying only etag_field instead of the records.
+
+        * retrieve: record's primary key and its etag_field value
+        * list: largest etag_field value and number of the filtered records. For numeric etag_field (version
+          counters) also the sum of values, because an incremented counter needn't be the largest one
+
+        Both also include the full URL (filters, cursor, ordering), render type and format, so that different
+        representations never share an ETag.
+
+        :param request: Request
+        :return: ETag (quoted) or None when the response shouldn't have one
+        """
+        if self.etag_field is None or request.method not in ('GET', 'HEAD'):
+            return None
+        action = getattr(self, 'action', None)
+        # Just the filtered records, without select_related & co: they're not needed for aggregates
+        queryset = self.filter_queryset(super().get_queryset())
+        if action == 'retrieve':
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            if lookup == 'new':
+                return None
+            try:
+                versions = list(queryset.filter(**{self.lookup_field: lookup}).values_list(self.etag_field)[:1])
+            except (TypeError, ValueError, DjangoValidationError):
+                # Invalid lookup value: get_object will respond with 404
+                return None
+            if not versions:
+                return None
+            parts = (lookup, versions[0][0])
+        elif action == 'list':
+            aggregates = dict(version=Max(self.etag_field), count=Count('pk'))
+            field = queryset.model._meta.get_field(self.etag_field)
+            if isinstance(field, (IntegerField, DecimalField, FloatField)):
+                aggregates['total'] = Sum(self.etag_field)
+            aggregate = queryset.aggregate(**aggregates)
+            parts = (aggregate['version'], aggregate['count'], aggregate.get('total'))
+        else:
+            return None
+        parts += (request.get_full_path(), self.render_type, getattr(request, 'accepted_media_type', None))
+        return '"%s"' % hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def not_modified(self, request) -> Optional[HttpResponseNotModified]:
+        """
+        Checks the request's If-None-Match against current ETag (see get_etag)
+
+        :param request: Request
+        :return: 304 response when client already has current data, None otherwise
+        """
+        self.etag = self.get_etag(request)
+        if self.etag is None:
+            return None
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', None)
+        if if_none_match is None:
+            return None
+        etags = parse_etags(if_none_match)
+        if '*' in etags or self.etag in etags or 'W/' + self.etag in etags:
+            return HttpResponseNotModified()
+        return None
+
+    def get_template_context(self) -> dict:
+        """
+        Returns template_context variables, evaluating callable template_context at most once per request
+
+        :return: dict with context variables
+        """
+        res = getattr(self, '_template_context', None)
+        if res is None:
+            if not callable(self.template_context):
+                res = self.template_context
+            elif self.template_context_timeout is None and not self.template_context_models:
+                res = self.template_context()
+            else:
+                res = cached_template_context(self)
+            self._template_context = res
+        return res
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.not_modified(request) or super().retrieve(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        res = self.not_modified(request)
+        if res is not None:
+            return res
+        if self.streaming_chunk_size and self.render_type in ('table', 'table rows') and self.paginator is None and \
+                isinstance(request.accepted_renderer, TemplateHTMLRenderer):
+            queryset = self.filter_queryset(self.get_queryset())
+            return StreamingHttpResponse(
+                request.accepted_renderer.render_stream(self, queryset, self.streaming_chunk_size),
+                content_type='text/html; charset=utf-8'
+            )
+        return super().list(request, *args, **kwargs)
+
     def finalize_response(self, request, response, *args, **kwargs):
         res = super().finalize_response(request, response, *args, **kwargs)
 
-        if isinstance(res.accepted_renderer, TemplateHTMLRenderer) and \
+        # Same URL renders as page, table, table rows, form or dialog
+        patch_vary_headers(res, ('X-DF-Render-Type',))
+        if self.etag is not None and (status.is_success(res.status_code) or res.status_code == 304):
+            res['ETag'] = self.etag
+
+        if isinstance(res, Response) and isinstance(res.accepted_renderer, TemplateHTMLRenderer) and \
                 (status.is_success(res.status_code) or res.status_code == status.HTTP_400_BAD_REQUEST):
             if isinstance(res.data, dict) and 'next' in res.data and 'results' in res.data and \
                     isinstance(res.data['results'], (ReturnList, ReturnDict)):
@@ -144,9 +571,57 @@ class ModelViewSet(NewMixin, viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
         queryset = self.filter_queryset(queryset)
+        queryset = self.optimize_queryset(queryset)
 
         return queryset.all()
 
+    def renders_table(self) -> bool:
+        """
+        Reports whether this request renders a list of records as HTML table
+
+        :return: True | False
+        """
+        return getattr(self, 'action', None) == 'list' and self.render_type in ('page', 'table', 'table rows') and \
+            isinstance(getattr(self.request, 'accepted_renderer', None), TemplateHTMLRenderer)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.prune_table_columns and self.renders_table():
+            # Table only shows some of the fields: don't serialize (and load from database) the rest
+            getattr(serializer, 'child', serializer).table_fields_only = True
+        return serializer
+
+    def optimize_queryset(self, queryset):
+        """
+        Loads related records the serializer needs along with the records (select_related / prefetch_related), so that
+        rendering a list doesn't query each record's relations separately. When rendering a table, only columns that
+        the table needs are loaded
+
+        :param queryset: Queryset
+        :return: queryset
+        """
+        serializer = self.get_serializer()
+        pruned = self.prune_table_columns and self.renders_table()
+        plan = getattr(serializer, 'table_query_plan' if pruned else 'query_plan', None)
+        if plan is None:
+            plan = QueryPlan((), ())
+        if self.select_related is not None or self.prefetch_related is not None:
+            # Relations given explicitly may not be among columns the plan loads: load all of them
+            plan = QueryPlan(
+                plan.select_related if self.select_related is None else self.select_related,
+                plan.prefetch_related if self.prefetch_related is None else self.prefetch_related,
+            )
+        return plan.apply(queryset)
+
+    def get_filter_plan(self, queryset):
+        """
+        Returns compiled filters for the queryset's model and this viewset's serializer
+
+        :param queryset: Queryset
+        :return: FilterPlan
+        """
+        return FilterPlan.get(queryset.model, self.get_serializer_class())
+
     def filter_queryset(self, queryset):
         """
         Applies filters for all fields
@@ -154,12 +629,16 @@ class ModelViewSet(NewMixin, viewsets.ModelViewSet):
         :param queryset: Queryset
         :return: queryset with filters applied
         """
-        res = queryset
-        for fld, val in self.request.query_params.items():
-            res = self.filter_queryset_field(res, fld, val)
+        if type(self).filter_queryset_field is not ModelViewSet.filter_queryset_field:
+            # filter_queryset_field is overridden: let it handle each of the parameters
+            res = queryset
+            for fld, val in self.request.query_params.items():
+                res = self.filter_queryset_field(res, fld, val)
+            return res
+
+        res, self.rejected_filters = self.get_filter_plan(queryset).apply(queryset, self.request.query_params.items())
         return res
 
-    # noinspection PyMethodMayBeStatic
     def filter_queryset_field(self, queryset, field, value):
         """
         Applies filter to individual field
@@ -169,49 +648,34 @@ class ModelViewSet(NewMixin, viewsets.ModelViewSet):
         :param value: Field value
         :return: queryset with applied filter for the field
         """
-        if value is None or value == '':
-            return queryset
-
-        model_meta = queryset.model._meta
-
-        if field not in (fld.name for fld in model_meta.get_fields()):
-            return queryset
-
-        if isinstance(model_meta.get_field(field), (models.CharField, models.TextField)):
-            return queryset.filter(**{field + '__icontains': value})
-        if isinstance(model_meta.get_field(field), (models.DateField, models.DateTimeField)):
-            date_time = None
-            for date_time_fmt in [settings.DATETIME_FORMAT, '%Y-%m-%dT%H:%M:%S', settings.DATE_FORMAT, '%Y-%m-%d']:
-                try:
-                    date_time = datetime.strptime(value, date_time_fmt)
-                    break
-                except:
-                    pass
-            if date_time is None:
-                return queryset
-            date_time.replace(tzinfo=pytz.utc)
-            if date_time.hour == 0 and date_time.minute == 0 and date_time.second == 0:
-                return queryset.filter(**{field + '__contains': date_time.date()})
-            return queryset.filter(**{field + '__contains': date_time})
-        else:
-            if isinstance(model_meta.get_field(field), models.BooleanField):
-                value = (value == 'true')
-            return queryset.filter(**{field: value})
+        return self.get_filter_plan(queryset).filter(queryset, field, value)
 
     @staticmethod
-    def generate_paged_loader(page_size: int = 30):
+    def generate_paged_loader(page_size: int = 30, ordering: Iterable[str] = ('id',),
+                              ordering_fields: Iterable[str] = (), include_count: bool = False):
         """
         Generates a Pagination class that will handle dynamic data loading for ViewSets with a lot of data.
         Use by declaring `pagination_class = ModelViewSet.generate_paged_loader()` in class variables
 
+        Records are paged by keyset (see pagination.KeysetPagination), so loading a page costs the same no matter how
+        far down the list it is. Clients can choose ordering with "ordering" query parameter (e.g. ?ordering=-name)
+        among ordering_fields. Each of those fields should have an index: system check warns about those that don't.
+
         :param page_size: how many records should be fetched at a time
+        :param ordering: default ordering
+        :param ordering_fields: fields the client may order by
+        :param include_count: when true, responses include number of records (estimated or cached, see
+           cache.record_count), shown below the table
         :return: a Pagination class
         """
-        from rest_framework.pagination import CursorPagination
-        ps = page_size
+        from .pagination import KeysetPagination
+        ps, default_ordering, allowed_ordering = page_size, tuple(ordering), tuple(ordering_fields)
+        with_count = include_count
 
-        class MyCursorPagination(CursorPagination):
-            ordering = 'id'
+        class MyKeysetPagination(KeysetPagination):
             page_size = ps
+            ordering = default_ordering
+            ordering_fields = allowed_ordering
+            include_count = with_count
 
-        return MyCursorPagination
+        return MyKeysetPagination
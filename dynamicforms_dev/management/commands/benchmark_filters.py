@@ -0,0 +1,81 @@
+import timeit
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models
+
+
+def legacy_filter_queryset_field(queryset, field, value):
+    """
+    Filtering as it was done by ModelViewSet.filter_queryset_field before FilterPlan
+    """
+    if value is None or value == '':
+        return queryset
+
+    model_meta = queryset.model._meta
+
+    if field not in (fld.name for fld in model_meta.get_fields()):
+        return queryset
+
+    if isinstance(model_meta.get_field(field), (models.CharField, models.TextField)):
+        return queryset.filter(**{field + '__icontains': value})
+    if isinstance(model_meta.get_field(field), (models.DateField, models.DateTimeField)):
+        date_time = None
+        for date_time_fmt in [settings.DATETIME_FORMAT, '%Y-%m-%dT%H:%M:%S', settings.DATE_FORMAT, '%Y-%m-%d']:
+            try:
+                date_time = datetime.strptime(value, date_time_fmt)
+                break
+            except:
+                pass
+        if date_time is None:
+            return queryset
+        if date_time.hour == 0 and date_time.minute == 0 and date_time.second == 0:
+            return queryset.filter(**{field + '__contains': date_time.date()})
+        return queryset.filter(**{field + '__contains': date_time})
+    else:
+        if isinstance(model_meta.get_field(field), models.BooleanField):
+            value = (value == 'true')
+        return queryset.filter(**{field: value})
+
+
+def wide_model():
+    """
+    Declares an unmanaged model with 50 fields. Only used for building querysets, never queried
+    """
+    attrs = dict(__module__=__name__, Meta=type('Meta', (), dict(app_label='dynamicforms_dev', managed=False)))
+    for i in range(50):
+        attrs['field_%02d' % i] = (models.CharField(max_length=20), models.IntegerField(), models.BooleanField(),
+                                   models.DateTimeField())[i % 4]
+    return type('BenchmarkWideModel', (models.Model,), attrs)
+
+
+class Command(BaseCommand):
+    help = 'Compare cost of FilterPlan with the previous per-parameter field scan for a model with 50 fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-n', dest='number', type=int, default=2000, action='store',
+                            help='number of filtered requests to time')
+
+    def handle(self, *args, **options):
+        from dynamicforms.filters import FilterPlan
+
+        model = wide_model()
+        params = [
+            ('field_48', 'abc'), ('field_49', '12'), ('field_46', 'true'), ('field_47', '2018-01-01'),
+            ('cursor', 'cD0xMA=='), ('df_render_type', 'table rows'), ('format', 'html'),
+        ]
+
+        def legacy():
+            queryset = model.objects.all()
+            for param, value in params:
+                queryset = legacy_filter_queryset_field(queryset, param, value)
+            return queryset
+
+        def plan():
+            return FilterPlan.get(model).apply(model.objects.all(), params)[0]
+
+        number = options['number']
+        for name, func in (('legacy', legacy), ('filter plan', plan)):
+            duration = min(timeit.repeat(func, number=number, repeat=3))
+            self.stdout.write('%-12s %8.1f us per request' % (name, duration / number * 1e6))
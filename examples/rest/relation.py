@@ -19,6 +19,7 @@ class RelationSerializer(serializers.ModelSerializer):
 
 class RelationViewset(ModelViewSet):
     template_context = dict(url_reverse='relation')
+    streaming_chunk_size = 100  # table renders of this unpaginated list are streamed
 
     queryset = Relation.objects.all()
     serializer_class = RelationSerializer
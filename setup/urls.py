@@ -19,4 +19,5 @@ from django.contrib import admin
 urlpatterns = [
     url(r'^', include('examples.urls')),
     url(r'^admin/', admin.site.urls),
+    url(r'^dynamicforms/', include('dynamicforms.urls')),
 ]
@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from dynamicforms import serializers
+from dynamicforms.mixins import Action
+from dynamicforms.templatetags.dynamicforms import register_form_actions
+from examples.models import HiddenFields
+from examples.rest.hidden_fields import HiddenFieldsSerializer
+
+
+class UUIDActionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HiddenFields
+        exclude = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.actions = [Action([self.fields['note'].uuid], 'examples.action_hiddenfields_note')]
+
+
+class ActionScriptTest(TestCase):
+
+    def test_compiled_once_per_class(self):
+        first, second = HiddenFieldsSerializer(), HiddenFieldsSerializer()
+        self.assertIs(first.action_script, second.action_script)
+        script = first.action_script
+        self.assertEqual(script.field_names, ('note', 'unit'))
+        self.assertIn('dynamicforms.registerActionModule("%s"' % script.hash, script.script)
+        self.assertIn('["note"], function () { return (examples.action_hiddenfields_note)', script.script)
+        # Script doesn't depend on the instance: no field ids in it
+        self.assertNotIn(str(first.fields['note'].uuid), script.script)
+
+    def test_actions_tracked_by_uuid_are_not_compiled(self):
+        self.assertIsNone(UUIDActionSerializer().action_script)
+
+    def test_form_registration(self):
+        serializer = HiddenFieldsSerializer()
+        js = register_form_actions(serializer)
+        self.assertIn('dynamicforms.loadActionModule("%s", "%s")' % (serializer.action_script.hash,
+                                                                    serializer.action_script.url), js)
+        self.assertIn('"note": "%s"' % serializer.fields['note'].uuid, js)
+        self.assertIn('"unit": "%s"' % serializer.fields['unit'].uuid, js)
+        self.assertNotIn('action_hiddenfields_note', js)
+
+    def test_served_with_long_lived_cache_headers(self):
+        script = HiddenFieldsSerializer().action_script
+        response = self.client.get(script.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode('utf-8'), script.script)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(HiddenFieldsSerializer().action_script.url, script.url)
+
+        stale = script.url.replace(script.hash, '0' * len(script.hash))
+        self.assertEqual(self.client.get(stale)['Cache-Control'], 'no-cache')
+
+    def test_bad_key(self):
+        script = HiddenFieldsSerializer().action_script
+        self.assertEqual(self.client.get(script.url[:-3]).status_code, 404)
@@ -0,0 +1,146 @@
+import json
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import IntegrityError
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from dynamicforms import serializers, settings, viewsets
+from dynamicforms.cache import record_count
+from examples.models import PageLoad
+
+
+class BulkSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PageLoad
+        fields = ('id', 'description')
+
+
+class BulkViewSet(viewsets.BulkMixin, viewsets.ModelViewSet):
+    queryset = PageLoad.objects.all()
+    serializer_class = BulkSerializer
+    bulk_chunk_size = 2
+
+
+class HookViewSet(BulkViewSet):
+    def perform_create(self, serializer):
+        serializer.save(description=serializer.validated_data['description'].upper())
+
+    def perform_update(self, serializer):
+        serializer.save(description=serializer.validated_data['description'].upper())
+
+
+class GuardedDeleteViewSet(BulkViewSet):
+    def destroy(self, request, *args, **kwargs):
+        raise exceptions.PermissionDenied()
+
+
+class BulkTest(APITestCase):
+
+    def setUp(self):
+        PageLoad.objects.all().delete()
+
+    def call(self, method, data, params='', viewset=BulkViewSet):
+        request = getattr(APIRequestFactory(), method)('/bulk/' + params, data, format='json')
+        response = viewset.as_view({'post': 'bulk', 'patch': 'bulk', 'delete': 'bulk'})(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_create(self):
+        response = self.call('post', [dict(description='Item %d' % i) for i in range(5)])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['committed'])
+        self.assertEqual([r['index'] for r in response.data['results']], list(range(5)))
+        self.assertEqual([PageLoad.objects.get(pk=r['pk']).description for r in response.data['results']],
+                         ['Item %d' % i for i in range(5)])
+        self.assertEqual(sorted(PageLoad.objects.values_list('description', flat=True)),
+                         ['Item %d' % i for i in range(5)])
+
+    def test_create_errors_roll_back(self):
+        response = self.call('post', [dict(description='Item 0'), dict(description='x' * 30), dict(description='ok')])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['committed'])
+        self.assertIn('description', response.data['results'][1]['errors'])
+        self.assertNotIn('errors', response.data['results'][2])
+        self.assertFalse(PageLoad.objects.exists())
+
+    def test_update(self):
+        records = [PageLoad.objects.create(description='Item %d' % i) for i in range(3)]
+        response = self.call('patch', [dict(pk=r.pk, changes=dict(description='Changed')) for r in records[:2]])
+        self.assertTrue(response.data['committed'])
+        self.assertEqual(list(PageLoad.objects.order_by('id').values_list('description', flat=True)),
+                         ['Changed', 'Changed', 'Item 2'])
+
+        response = self.call('patch', [dict(pk=records[2].pk, changes=dict(description='Again')),
+                                       dict(pk=-1, changes={}), dict(changes='x')])
+        self.assertEqual([r.get('errors') for r in response.data['results']],
+                         [None, ['Not found.'], ['Expected {"pk": ..., "changes": {...}}']])
+        self.assertEqual(PageLoad.objects.get(pk=records[2].pk).description, 'Item 2')
+
+    def test_delete(self):
+        records = [PageLoad.objects.create(description='Item %d' % (i % 2)) for i in range(5)]
+        response = self.call('delete', dict(pk=[records[0].pk, str(records[1].pk)]))
+        self.assertTrue(response.data['committed'])
+        self.assertEqual(PageLoad.objects.count(), 3)
+
+        response = self.call('delete', [records[2].pk, -1])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PageLoad.objects.count(), 3)
+
+        self.assertEqual(self.call('delete', None).status_code, 400)
+        response = self.call('delete', None, '?description=Item 0')
+        self.assertEqual([r['pk'] for r in response.data['results']], [records[2].pk, records[4].pk])
+        self.assertEqual(list(PageLoad.objects.values_list('pk', flat=True)), [records[3].pk])
+
+    def test_stream(self):
+        response = self.call('post', [dict(description='Item %d' % i) for i in range(3)], '?stream=1')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual([line.get('index') for line in lines], [0, 1, 2, None])
+        self.assertEqual(lines[-1], dict(committed=True))
+        self.assertEqual(PageLoad.objects.count(), 3)
+
+    def test_caches_invalidated(self):
+        caches[settings.COUNT_CACHE].clear()
+        filtered = PageLoad.objects.filter(description='Item')
+        self.assertEqual(record_count(filtered)[0], 0)
+        self.call('post', [dict(description='Item') for i in range(3)])
+        self.assertEqual(record_count(filtered)[0], 3)
+        self.call('patch', [dict(pk=pk, changes=dict(description='Other'))
+                            for pk in PageLoad.objects.values_list('pk', flat=True)[:1]])
+        self.assertEqual(record_count(filtered)[0], 2)
+
+    def test_perform_hooks(self):
+        self.call('post', [dict(description='item %d' % i) for i in range(3)], viewset=HookViewSet)
+        self.assertEqual(sorted(PageLoad.objects.values_list('description', flat=True)),
+                         ['ITEM %d' % i for i in range(3)])
+        record = PageLoad.objects.first()
+        self.call('patch', [dict(pk=record.pk, changes=dict(description='changed'))], viewset=HookViewSet)
+        self.assertEqual(PageLoad.objects.get(pk=record.pk).description, 'CHANGED')
+
+    def test_opt_in(self):
+        self.assertNotIn('bulk', [a.url_path for a in viewsets.ModelViewSet.get_extra_actions()])
+        self.assertIn('bulk', [a.url_path for a in BulkViewSet.get_extra_actions()])
+
+    def test_refused_when_bypassing_overrides(self):
+        record = PageLoad.objects.create(description='Item')
+        response = self.call('delete', [record.pk], viewset=GuardedDeleteViewSet)
+        self.assertEqual(response.status_code, 405)
+        self.assertTrue(PageLoad.objects.filter(pk=record.pk).exists())
+        self.assertEqual(self.call('post', [dict(description='x')], viewset=GuardedDeleteViewSet).status_code, 200)
+
+    def test_database_error(self):
+        records = [PageLoad.objects.create(description='Item %d' % i) for i in range(3)]
+        changes = [dict(pk=r.pk, changes=dict(description='Changed')) for r in records]
+        with mock.patch.object(PageLoad.objects, 'bulk_update', side_effect=IntegrityError('duplicate')):
+            response = self.call('patch', changes)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.data['committed'])
+            # Items of the failed chunk (bulk_chunk_size = 2) get an error, the rest are only validated
+            self.assertEqual([bool(r.get('errors')) for r in response.data['results']], [True, True, False])
+
+            response = self.call('patch', changes, '?stream=1')
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+            self.assertEqual(lines[-1], dict(committed=False))
+        self.assertFalse(PageLoad.objects.filter(description='Changed').exists())
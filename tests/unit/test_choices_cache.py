@@ -0,0 +1,65 @@
+from django.utils import translation
+from rest_framework.test import APITestCase
+
+from dynamicforms import serializers
+from dynamicforms.cache import ChoicesCache, choices_cache
+from examples.models import AdvancedFields, Relation
+
+
+class ChoicesSerializer(serializers.ModelSerializer):
+    primary_key_related_field = serializers.PrimaryKeyRelatedField(queryset=Relation.objects.all(), cache_choices=True)
+    slug_related_field = serializers.SlugRelatedField(slug_field='name', queryset=Relation.objects.all())
+
+    class Meta:
+        model = AdvancedFields
+        fields = ('id', 'primary_key_related_field', 'slug_related_field')
+
+
+class ChoicesCacheTest(APITestCase):
+
+    def setUp(self):
+        choices_cache.invalidate()
+        Relation.objects.all().delete()
+        self.relations = [Relation.objects.create(name='Relation %d' % i) for i in range(3)]
+
+    def choices(self, field_name='primary_key_related_field'):
+        return [option.display_text for option in ChoicesSerializer().fields[field_name].iter_options()]
+
+    def test_shared_between_serializers(self):
+        self.assertEqual(self.choices(), ['Relation 0', 'Relation 1', 'Relation 2'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.choices(), ['Relation 0', 'Relation 1', 'Relation 2'])
+        with self.assertNumQueries(1):
+            # not declared with cache_choices
+            self.choices('slug_related_field')
+        with translation.override('de'), self.assertNumQueries(1):
+            self.choices()
+
+    def test_invalidated_on_change(self):
+        self.choices()
+        self.relations[0].name = 'Changed'
+        self.relations[0].save()
+        self.assertEqual(self.choices()[0], 'Changed')
+        self.relations[1].delete()
+        self.assertEqual(self.choices(), ['Changed', 'Relation 2'])
+
+    def test_lru_eviction(self):
+        cache = ChoicesCache(max_size=1300, timeout=None)
+        field = ChoicesSerializer().fields['primary_key_related_field']
+        querysets = [Relation.objects.filter(pk__gte=r.pk) for r in self.relations]
+        for queryset in querysets:
+            cache.get_or_build(field, queryset, lambda: {'x' * 200: 'y'})
+        self.assertLessEqual(cache.size, 1300)
+        self.assertEqual(len(cache._entries), 3)
+
+        cache.get_or_build(field, querysets[0], lambda: self.fail('Should be cached'))
+        cache.get_or_build(field, Relation.objects.all(), lambda: {'x' * 200: 'y'})
+        # querysets[1] was least recently used
+        self.assertNotIn(ChoicesCache.key(field, querysets[1]), cache._entries)
+        self.assertIn(ChoicesCache.key(field, querysets[0]), cache._entries)
+
+    def test_expiry(self):
+        cache = ChoicesCache(max_size=1000, timeout=0)
+        field = ChoicesSerializer().fields['primary_key_related_field']
+        cache.get_or_build(field, Relation.objects.all(), dict)
+        self.assertEqual(cache.get_or_build(field, Relation.objects.all(), lambda: {1: 'rebuilt'}), {1: 'rebuilt'})
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from dynamicforms import serializers, viewsets
+from examples.models import Filter
+
+
+class VersionedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Filter
+        exclude = ()
+
+
+class VersionedViewSet(viewsets.ModelViewSet):
+    template_context = dict(url_reverse='filter')
+    queryset = Filter.objects.all()
+    serializer_class = VersionedSerializer
+    etag_field = 'datetime_field'
+
+
+class CounterViewSet(VersionedViewSet):
+    etag_field = 'int_field'
+
+
+class ETagTest(APITestCase):
+
+    def setUp(self):
+        Filter.objects.all().delete()
+        for i in range(3):
+            Filter.objects.create(char_field='Record %d' % i, int_field=i, int_choice_field=0, bool_field=True,
+                                  datetime_field=timezone.make_aware(datetime(2018, 1, i + 1)))
+
+    def get(self, action='list', render_type='table', etag=None, fmt='html', viewset=VersionedViewSet, **kwargs):
+        headers = dict(HTTP_X_DF_RENDER_TYPE=render_type)
+        if etag:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        request = APIRequestFactory().get('/versioned/', dict(format=fmt), **headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = viewset.as_view({'get': action})(request, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response, len(queries)
+
+    def test_list(self):
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-DF-Render-Type', response['Vary'])
+        etag = response['ETag']
+
+        response, queries = self.get(etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(queries, 1)
+
+        # Different representation of the same URL
+        self.assertNotEqual(self.get(render_type='table rows')[0]['ETag'], etag)
+
+        record = Filter.objects.first()
+        record.datetime_field = timezone.make_aware(datetime(2019, 1, 1))
+        record.save()
+        self.assertEqual(self.get(etag=etag)[0].status_code, 200)
+
+    def test_list_changes_when_record_deleted(self):
+        etag = self.get()[0]['ETag']
+        Filter.objects.order_by('datetime_field').first().delete()
+        self.assertEqual(self.get(etag=etag)[0].status_code, 200)
+
+    def test_list_changes_when_counter_below_max_incremented(self):
+        etag = self.get(viewset=CounterViewSet)[0]['ETag']
+        self.assertEqual(self.get(etag=etag, viewset=CounterViewSet)[0].status_code, 304)
+        # Largest counter and number of records stay the same
+        Filter.objects.filter(int_field=0).update(int_field=1)
+        self.assertEqual(self.get(etag=etag, viewset=CounterViewSet)[0].status_code, 200)
+
+    def test_retrieve(self):
+        record = Filter.objects.first()
+        response, _ = self.get('retrieve', 'form', fmt='json', pk=record.pk)
+        etag = response['ETag']
+        self.assertEqual(self.get('retrieve', 'form', fmt='json', etag=etag, pk=record.pk)[0].status_code, 304)
+        self.assertEqual(self.get('retrieve', 'form', fmt='json', etag='W/' + etag, pk=record.pk)[0].status_code, 304)
+
+        Filter.objects.filter(pk=record.pk).update(datetime_field=timezone.make_aware(datetime(2019, 1, 1)))
+        self.assertEqual(self.get('retrieve', 'form', fmt='json', etag=etag, pk=record.pk)[0].status_code, 200)
+
+    def test_new_has_no_etag(self):
+        response, _ = self.get('retrieve', 'form', fmt='json', pk='new')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_invalid_lookup(self):
+        response, _ = self.get('retrieve', 'form', fmt='json', pk='abc')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
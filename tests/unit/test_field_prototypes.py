@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.validators import UniqueValidator
+
+from dynamicforms import fields, serializers
+from examples.models import Filter, Relation
+from examples.rest.filter import FilterSerializer
+
+
+class RelationSerializer(serializers.ModelSerializer):
+    names = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta:
+        model = Relation
+        exclude = ()
+
+
+class UniqueNameSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(validators=[UniqueValidator(queryset=Relation.objects.all())])
+
+    class Meta:
+        model = Relation
+        exclude = ()
+
+
+class FieldPrototypesTest(TestCase):
+
+    def test_fields_are_built_once(self):
+        FilterSerializer().fields
+        with mock.patch.object(fields.CharField, '__init__', side_effect=AssertionError('Field constructed')):
+            serializer = FilterSerializer()
+            self.assertIn('char_field', serializer.fields)
+
+    def test_clones_are_independent(self):
+        first, second = FilterSerializer(), FilterSerializer()
+        first.fields['char_field'].style['x'] = 1
+        first.fields['char_field'].actions.append('action')
+        second_field = second.fields['char_field']
+        self.assertNotIn('x', second_field.style)
+        self.assertEqual(second_field.actions, [])
+        self.assertIs(second_field.parent, second)
+        self.assertNotEqual(first.fields['char_field'].uuid, second_field.uuid)
+
+    def test_stateful_validators_are_not_shared(self):
+        first, second = UniqueNameSerializer().fields['name'], UniqueNameSerializer().fields['name']
+        self.assertIsNot(first.validators[0], second.validators[0])
+        self.assertIsInstance(second.validators[0], UniqueValidator)
+
+        relation = Relation.objects.create(name='Taken')
+        self.assertTrue(UniqueNameSerializer(relation, data=dict(name='Taken')).is_valid())
+        self.assertFalse(UniqueNameSerializer(data=dict(name='Taken')).is_valid())
+
+    def test_same_representation(self):
+        instance = Filter(id=1, char_field='abc', int_field=1, int_choice_field=1, bool_field=True)
+        with mock.patch.object(FilterSerializer, 'cache_fields', False):
+            expected = FilterSerializer(instance).data
+        self.assertEqual(FilterSerializer(instance).data, expected)
+        self.assertEqual(FilterSerializer(instance).data, expected)
+
+    def test_nested_fields(self):
+        RelationSerializer().fields
+        first, second = RelationSerializer(), RelationSerializer()
+        self.assertIsNot(first.fields['names'].child, second.fields['names'].child)
+        self.assertIs(second.fields['names'].child.parent, second.fields['names'])
+
+    def test_opt_out(self):
+        with mock.patch.object(FilterSerializer, 'cache_fields', False):
+            FilterSerializer().fields
+            with mock.patch.object(fields.CharField, '__init__', side_effect=AssertionError('Field constructed')):
+                with self.assertRaises(AssertionError):
+                    FilterSerializer().fields
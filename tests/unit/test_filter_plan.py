@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import pytz
+from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from dynamicforms import serializers
+from dynamicforms.filters import FilterPlan
+from examples.models import Filter
+from examples.rest.filter import FilterSerializer
+
+
+class AliasSerializer(serializers.ModelSerializer):
+    text = serializers.CharField(source='char_field')
+
+    class Meta:
+        model = Filter
+        exclude = ()
+
+
+class FilterPlanTest(TestCase):
+
+    def setUp(self):
+        Filter.objects.all().delete()
+        for i in range(4):
+            Filter.objects.create(char_field='Value %d' % i, int_field=i, int_choice_field=i, bool_field=bool(i % 2),
+                                  datetime_field=datetime(2018, 1, i + 1, 12, tzinfo=pytz.utc))
+
+    def test_plan_is_cached(self):
+        self.assertIs(FilterPlan.get(Filter, FilterSerializer), FilterPlan.get(Filter, FilterSerializer))
+        self.assertIsNot(FilterPlan.get(Filter, FilterSerializer), FilterPlan.get(Filter, AliasSerializer))
+
+    def test_apply(self):
+        plan = FilterPlan.get(Filter, FilterSerializer)
+        queryset, rejected = plan.apply(Filter.objects.all(), [
+            ('char_field', 'value'), ('bool_field', 'true'), ('int_field', ''), ('cursor', 'abc'),
+            ('df_render_type', 'table')
+        ])
+        self.assertEqual(sorted(queryset.values_list('int_field', flat=True)), [1, 3])
+        self.assertEqual(rejected, ['cursor', 'df_render_type'])
+
+    def test_coercion(self):
+        plan = FilterPlan.get(Filter, FilterSerializer)
+        queryset, rejected = plan.apply(Filter.objects.all(), [('int_field', '2'), ('int_choice_field', 'abc')])
+        self.assertEqual(list(queryset.values_list('int_field', flat=True)), [2])
+        self.assertEqual(rejected, ['int_choice_field'])
+
+        queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-01-03')])
+        self.assertEqual(list(queryset.values_list('int_field', flat=True)), [2])
+        self.assertEqual(plan.apply(Filter.objects.all(), [('datetime_field', 'yesterday')])[1], ['datetime_field'])
+
+    def test_date_ranges(self):
+        plan = FilterPlan.get(Filter, FilterSerializer)
+
+        queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-01-02')])
+        sql = str(queryset.query)
+        self.assertIn('>=', sql)
+        self.assertIn('<', sql)
+        self.assertNotIn('LIKE', sql)
+        self.assertEqual(list(queryset.values_list('int_field', flat=True)), [1])
+
+        queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field__from', '2018-01-02'),
+                                                               ('datetime_field__to', '2018-01-03')])
+        self.assertEqual(sorted(queryset.values_list('int_field', flat=True)), [1, 2])
+
+        queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-01-02T12:00')])
+        self.assertEqual(list(queryset.values_list('int_field', flat=True)), [1])
+        queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-01-02T12:01')])
+        self.assertEqual(list(queryset), [])
+
+    def test_date_range_timezone(self):
+        plan = FilterPlan.get(Filter, FilterSerializer)
+        with timezone.override('Asia/Tokyo'):
+            # 2018-01-02 12:00 UTC is 2018-01-02 21:00 in Tokyo, 2018-01-03 12:00 UTC is 21:00 on 2018-01-03
+            queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-01-03')])
+            self.assertEqual(list(queryset.values_list('int_field', flat=True)), [2])
+            queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-01-02T21:00')])
+            self.assertEqual(list(queryset.values_list('int_field', flat=True)), [1])
+
+    def test_date_range_dst_transition(self):
+        plan = FilterPlan.get(Filter, FilterSerializer)
+        Filter.objects.filter(int_field=0).update(datetime_field=datetime(2018, 11, 4, 3, tzinfo=pytz.utc))
+        Filter.objects.filter(int_field=1).update(datetime_field=datetime(2018, 10, 28, 0, 30, tzinfo=pytz.utc))
+        with timezone.override('America/Sao_Paulo'):
+            # Clocks jumped from 00:00 to 01:00 on 2018-11-04: the day starts at a time that doesn't exist
+            queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field', '2018-11-04')])
+            self.assertEqual((list(queryset.values_list('int_field', flat=True)), rejected), ([0], []))
+            self.assertEqual(plan.apply(Filter.objects.all(), [('datetime_field', '2018-11-04T00:30')])[1], [])
+        with timezone.override('Europe/Ljubljana'):
+            # 02:30 occurred twice on 2018-10-28 (00:30 and 01:30 UTC)
+            queryset, rejected = plan.apply(Filter.objects.all(), [('datetime_field__from', '2018-10-28T02:30'),
+                                                                   ('datetime_field__to', '2018-10-28T02:30')])
+            self.assertEqual((list(queryset.values_list('int_field', flat=True)), rejected), ([1], []))
+
+    def test_serializer_source(self):
+        queryset, rejected = FilterPlan.get(Filter, AliasSerializer).apply(Filter.objects.all(), [('text', '3')])
+        self.assertEqual(list(queryset.values_list('int_field', flat=True)), [3])
+        self.assertEqual(rejected, [])
+
+
+class FilterViewSetTest(APITestCase):
+
+    def test_filter_request(self):
+        Filter.objects.all().delete()
+        Filter.objects.create(char_field='Needle', int_field=1, int_choice_field=1, bool_field=True,
+                              datetime_field=datetime(2018, 1, 1, tzinfo=pytz.utc))
+        Filter.objects.create(char_field='Hay', int_field=2, int_choice_field=1, bool_field=True,
+                              datetime_field=datetime(2018, 1, 1, tzinfo=pytz.utc))
+        response = self.client.get(reverse('filter-list', args=['json']), dict(char_field='need', int_field='x'))
+        self.assertEqual([row['char_field'] for row in response.data['results']], ['Needle'])
@@ -0,0 +1,86 @@
+import threading
+from unittest import mock
+
+from django.template import Context, Template
+from django.test import RequestFactory
+from rest_framework.test import APITestCase
+
+from dynamicforms import cache, settings
+from examples.models import Filter
+from examples.rest.filter import FilterSerializer
+
+
+class FilterRowTest(APITestCase):
+
+    def setUp(self):
+        patcher = mock.patch('dynamicforms.cache.templates_cacheable', return_value=True)
+        self.templates_cacheable = patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear_filter_rows()
+        if '_filter_data' in FilterSerializer.__dict__:
+            del FilterSerializer._filter_data
+
+    @staticmethod
+    def render(query=''):
+        context = Context(dict(serializer=FilterSerializer()))
+        context.request = RequestFactory().get('/filter/' + query)
+        return Template('{% load dynamicforms %}{% render_filter_row serializer %}').render(context)
+
+    def test_built_once(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(FilterSerializer().filter_data)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(r) for r in results}), 1)
+        self.assertEqual(results[0].serializer_type, 'filter')
+        self.assertTrue(results[0].fields['int_choice_field'].allow_blank)
+        # Subclasses get their own filter serializer
+        subclass = type('FilterSubclassSerializer', (FilterSerializer,), {})
+        self.assertIsInstance(subclass().filter_data, subclass)
+
+    def test_rendered_once(self):
+        first = self.render()
+        self.assertIn('dynamicforms-filterrow', first)
+        with mock.patch('dynamicforms.templatetags.dynamicforms.render_form',
+                        side_effect=AssertionError('Filter row not cached')):
+            self.assertEqual(self.render(), first)
+
+    def test_applied_values_are_set_by_script(self):
+        first = self.render()
+        html = self.render('?char_field=</script>&int_field=5&unknown=1&bool_field=')
+        self.assertTrue(html.startswith(first))
+        script = html[len(first):]
+        self.assertIn('dynamicforms.setFilterValues("%s"' % FilterSerializer().filter_data.uuid, script)
+        self.assertIn('"int_field": "5"', script)
+        self.assertIn('\\u003C/script\\u003E', script)
+        self.assertNotIn('unknown', script)
+        self.assertNotIn('bool_field', script)
+
+    def test_unrelated_saves_keep_cache(self):
+        self.render()
+        Filter.objects.create(char_field='x', datetime_field='2018-01-01T00:00:00Z', int_field=1, int_choice_field=0,
+                              bool_field=True)
+        self.assertIn(FilterSerializer, cache._filter_rows)
+
+    def test_not_cached_when_templates_are_reloaded(self):
+        self.templates_cacheable.return_value = False
+        self.render()
+        self.assertNotIn(FilterSerializer, cache._filter_rows)
+
+    def test_no_timeout(self):
+        serializer_class = type('NoTimeoutSerializer', (FilterSerializer,), {})
+        with mock.patch.object(settings, 'CHOICES_CACHE_TIMEOUT', None), \
+                mock.patch.object(settings, 'OPTIONS_KEY_MAX_AGE', None):
+            html = cache.filter_row_html(serializer_class, 'template.html', [Filter], lambda: 'row')
+        self.assertEqual(html, 'row')
+        self.assertEqual(cache._filter_rows[serializer_class][cache.get_language(), 'template.html'], (None, 'row'))
+
+    def test_expires_before_options_keys(self):
+        serializer_class = type('KeyAgeSerializer', (FilterSerializer,), {})
+        with mock.patch.object(settings, 'CHOICES_CACHE_TIMEOUT', None), \
+                mock.patch.object(settings, 'OPTIONS_KEY_MAX_AGE', 600), \
+                mock.patch.object(cache.time, 'monotonic', return_value=1000):
+            cache.filter_row_html(serializer_class, 'template.html', [Filter], lambda: 'row')
+        self.assertEqual(cache._filter_rows[serializer_class][cache.get_language(), 'template.html'], (1300, 'row'))
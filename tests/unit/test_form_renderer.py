@@ -0,0 +1,48 @@
+import re
+from unittest import mock
+
+from django.conf import settings
+from django.template import loader
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from dynamicforms.renderers import HTMLFormRenderer
+from examples.models import Filter
+from examples.rest.filter import FilterSerializer
+
+
+def templates(debug: bool, cached: bool):
+    options = dict(settings.TEMPLATES[0]['OPTIONS'], debug=debug)
+    loaders = ['django.template.loaders.app_directories.Loader']
+    options['loaders'] = [('django.template.loaders.cached.Loader', loaders)] if cached else loaders
+    return [dict(settings.TEMPLATES[0], APP_DIRS=False, OPTIONS=options)]
+
+
+@override_settings(TEMPLATES=templates(debug=False, cached=True))
+class FormRendererTest(APITestCase):
+
+    def setUp(self):
+        HTMLFormRenderer.clear_template_cache()
+
+    def render(self):
+        serializer = FilterSerializer(Filter(char_field='abc', int_field=1))
+        res = HTMLFormRenderer().render(serializer.data, renderer_context={})
+        return re.sub('[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', 'uuid', res)
+
+    def test_templates_resolved_once(self):
+        first = self.render()
+        with mock.patch.object(loader, 'get_template', side_effect=AssertionError('Template not cached')):
+            self.assertEqual(self.render(), first)
+        self.assertTrue(HTMLFormRenderer._field_templates)
+        self.assertTrue(HTMLFormRenderer._form_templates)
+
+    def test_templates_reloaded_in_debug(self):
+        for debug, cached in ((True, True), (False, False)):
+            with override_settings(TEMPLATES=templates(debug=debug, cached=cached)):
+                first = self.render()
+                with mock.patch.object(loader, 'get_template', side_effect=AssertionError('Template not reloaded')):
+                    with self.assertRaises(AssertionError):
+                        self.render()
+                self.assertFalse(HTMLFormRenderer._field_templates)
+                self.assertFalse(HTMLFormRenderer._form_templates)
+                self.assertEqual(self.render(), first)
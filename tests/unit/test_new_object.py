@@ -0,0 +1,43 @@
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from dynamicforms import serializers, viewsets
+from examples.models import PageLoad
+
+
+class NewObjectSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PageLoad
+        fields = ('id', 'description')
+
+
+class NewObjectViewSet(viewsets.ModelViewSet):
+    queryset = PageLoad.objects.all()
+    serializer_class = NewObjectSerializer
+    calls = 0
+
+    def new_object(self):
+        type(self).calls += 1
+        return PageLoad(description='Default')
+
+
+class NewObjectTest(APITestCase):
+
+    def retrieve(self, viewset, pk):
+        request = APIRequestFactory().get('/new-object/', dict(format='json'))
+        return viewset.as_view({'get': 'retrieve'})(request, pk=pk)
+
+    def test_new_does_not_query(self):
+        with self.assertNumQueries(0):
+            response = self.retrieve(NewObjectViewSet, 'new')
+        self.assertEqual(response.data['description'], 'Default')
+        self.assertIsNone(response.data['id'])
+
+    def test_cached_new_object(self):
+        viewset = type('CachedNewObjectViewSet', (NewObjectViewSet,), dict(cache_new_object=True, calls=0))
+        for i in range(3):
+            self.assertEqual(self.retrieve(viewset, 'new').data['description'], 'Default')
+        self.assertEqual(viewset.calls, 1)
+        self.assertIsNot(viewset().get_new_object(), viewset().get_new_object())
+
+    def test_missing_record(self):
+        self.assertEqual(self.retrieve(NewObjectViewSet, '0').status_code, 404)
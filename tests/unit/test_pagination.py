@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from dynamicforms.pagination import check_view_ordering
+from dynamicforms.viewsets import ModelViewSet
+from examples.models import Filter, PageLoad
+from examples.rest.page_load import PageLoadViewSet
+
+
+class KeysetPaginationTest(TestCase):
+
+    def setUp(self):
+        PageLoad.objects.all().delete()
+        # Lots of ties in description
+        PageLoad.objects.bulk_create(PageLoad(description='Item %d' % (i % 4)) for i in range(23))
+        self.paginator_class = ModelViewSet.generate_paged_loader(5, ordering_fields=('description',))
+
+    def page(self, url):
+        paginator = self.paginator_class()
+        records = paginator.paginate_queryset(PageLoad.objects.all(), Request(APIRequestFactory().get(url)))
+        return [r.id for r in records], paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_forward_and_back(self):
+        expected = list(PageLoad.objects.order_by('-description', '-id').values_list('id', flat=True))
+        pages, url = [], '/page-load/?ordering=-description'
+        while url:
+            records, url, previous = self.page(url)
+            pages.append((records, previous))
+        self.assertEqual([r for records, _ in pages for r in records], expected)
+        self.assertEqual([len(records) for records, _ in pages], [5, 5, 5, 5, 3])
+        self.assertIsNone(pages[0][1])
+
+        # Walk back from the last page using previous links
+        url, back = pages[-1][1], []
+        while url:
+            records, _, url = self.page(url)
+            back.insert(0, records)
+        self.assertEqual(back, [records for records, _ in pages[:-1]])
+
+    def test_sub_millisecond_ordering_key(self):
+        Filter.objects.all().delete()
+        start = timezone.make_aware(datetime(2018, 1, 1))
+        for i in range(10):
+            Filter.objects.create(char_field='Record %d' % i, int_field=i, int_choice_field=0, bool_field=True,
+                                  datetime_field=start + timedelta(microseconds=i * 10))
+        paginator_class = ModelViewSet.generate_paged_loader(3, ordering=('datetime_field',))
+        records, url = [], '/filter/'
+        while url and len(records) <= 10:
+            paginator = paginator_class()
+            records += [r.int_field for r in paginator.paginate_queryset(Filter.objects.all(),
+                                                                         Request(APIRequestFactory().get(url)))]
+            url = paginator.get_next_link()
+        self.assertEqual(records, list(range(10)))
+
+    def test_default_ordering(self):
+        records, next_link, previous = self.page('/page-load/?ordering=id_not_allowed')
+        self.assertEqual(records, list(PageLoad.objects.order_by('id').values_list('id', flat=True)[:5]))
+        self.assertIn('cursor=', next_link)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.page('/page-load/?cursor=abc')
+
+    def test_index_check(self):
+        view = type('UnindexedViewSet', (PageLoadViewSet,), dict(pagination_class=self.paginator_class))
+        self.assertEqual([e.id for e in check_view_ordering(view)], ['dynamicforms.W001'])
+        view.pagination_class = ModelViewSet.generate_paged_loader(5, ordering_fields=('missing',))
+        self.assertEqual([e.id for e in check_view_ordering(view)], ['dynamicforms.E001'])
+        view.pagination_class = ModelViewSet.generate_paged_loader(5)
+        self.assertEqual(check_view_ordering(view), [])
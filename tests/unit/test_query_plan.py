@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from dynamicforms import serializers
+from dynamicforms.query import QueryPlan
+from examples.models import AdvancedFields, Relation
+from examples.rest.advanced_fields import AdvancedFieldsSerializer, AdvancedFieldsViewset
+
+
+class RelationSerializer(serializers.ModelSerializer):
+    slug_names = serializers.SlugRelatedField(source='slug', slug_field='regex_field', many=True, read_only=True)
+    primary_name = serializers.CharField(source='primary.slug_related_field.name', read_only=True)
+
+    class Meta:
+        model = Relation
+        fields = ('id', 'name', 'slug_names', 'primary_name')
+
+
+class QueryPlanTest(APITestCase):
+
+    def setUp(self):
+        AdvancedFields.objects.all().delete()
+        Relation.objects.all().delete()
+
+    def create(self, count):
+        for i in range(count):
+            relation = Relation.objects.create(name='Relation %d' % i)
+            AdvancedFields.objects.create(regex_field='abcdef', choice_field='0', filepath_field='examples/models.py',
+                                          primary_key_related_field=relation, slug_related_field=relation)
+
+    def test_plan(self):
+        plan = AdvancedFieldsSerializer().query_plan
+        self.assertEqual(plan.select_related, ('primary_key_related_field', 'slug_related_field'))
+        self.assertEqual(plan.prefetch_related, ())
+        self.assertIs(AdvancedFieldsSerializer().query_plan, plan)
+
+        plan = QueryPlan.from_serializer(RelationSerializer())
+        self.assertEqual(plan.select_related, ('primary__slug_related_field',))
+        self.assertEqual(plan.prefetch_related, ('slug',))
+
+    def count_queries(self, url, rows):
+        self.create(rows)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_X_DF_RENDER_TYPE='table')
+            self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        for fmt in ('json', 'html'):
+            url = reverse('advanced-fields-list', args=[fmt])
+            small = self.count_queries(url, 2)
+            self.assertEqual(self.count_queries(url, 5), small, fmt)
+
+    def test_override(self):
+        self.create(3)
+        with mock.patch.object(AdvancedFieldsViewset, 'query_budget', 3), \
+                mock.patch.object(AdvancedFieldsViewset, 'select_related', ()):
+            with self.assertRaisesMessage(AssertionError, 'query budget is 3'):
+                self.client.get(reverse('advanced-fields-list', args=['json']))
+
+    def test_query_budget(self):
+        self.create(3)
+        with mock.patch.object(AdvancedFieldsViewset, 'query_budget', 3):
+            response = self.client.get(reverse('advanced-fields-list', args=['json']))
+            self.assertEqual(len(response.data), 3)
+        with mock.patch.object(AdvancedFieldsViewset, 'query_budget', 0):
+            with self.assertRaisesMessage(AssertionError, 'query budget is 0'):
+                self.client.get(reverse('advanced-fields-list', args=['json']))
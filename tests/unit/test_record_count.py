@@ -0,0 +1,52 @@
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from dynamicforms import settings
+from dynamicforms.cache import estimated_count, record_count
+from dynamicforms.viewsets import ModelViewSet
+from examples.models import PageLoad
+
+
+class RecordCountTest(TestCase):
+
+    def setUp(self):
+        caches[settings.COUNT_CACHE].clear()
+        PageLoad.objects.all().delete()
+        PageLoad.objects.bulk_create(PageLoad(description='Item %d' % (i % 4)) for i in range(23))
+
+    def test_filtered_count_is_cached(self):
+        queryset = PageLoad.objects.filter(description='Item 1')
+        self.assertEqual(record_count(queryset), (6, False))
+        with self.assertNumQueries(0):
+            self.assertEqual(record_count(PageLoad.objects.filter(description='Item 1')), (6, False))
+        self.assertEqual(record_count(PageLoad.objects.filter(description='Item 2')), (6, False))
+
+    def test_invalidated_on_save_and_delete(self):
+        queryset = PageLoad.objects.filter(description='Item 1')
+        self.assertEqual(record_count(queryset)[0], 6)
+        PageLoad.objects.create(description='Item 1')
+        self.assertEqual(record_count(queryset)[0], 7)
+        PageLoad.objects.filter(description='Item 1').first().delete()
+        self.assertEqual(record_count(queryset)[0], 6)
+
+    def test_planner_estimate(self):
+        self.assertIsNone(estimated_count(PageLoad.objects.filter(description='Item 1')))
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(record_count(PageLoad.objects.all()), (23, True))
+        self.assertEqual(record_count(PageLoad.objects.filter(description='Item 1')), (6, False))
+
+    def test_paginated_response(self):
+        paginator = ModelViewSet.generate_paged_loader(5, include_count=True)()
+        records = paginator.paginate_queryset(PageLoad.objects.filter(description='Item 0'),
+                                              Request(APIRequestFactory().get('/page-load/')))
+        data = paginator.get_paginated_response([r.id for r in records]).data
+        self.assertEqual(list(data.keys()), ['next', 'previous', 'count', 'count_estimated', 'results'])
+        self.assertEqual((data['count'], data['count_estimated']), (6, False))
+
+        paginator = ModelViewSet.generate_paged_loader(5)()
+        paginator.paginate_queryset(PageLoad.objects.all(), Request(APIRequestFactory().get('/page-load/')))
+        self.assertNotIn('count', paginator.get_paginated_response([]).data)
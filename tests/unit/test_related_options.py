@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.test import APITestCase
+
+from dynamicforms import serializers, settings, viewsets
+from dynamicforms.mixins import RelatedOptionsMixin
+from dynamicforms.renderers import HTMLFormRenderer
+from examples.models import AdvancedFields, Relation
+
+
+class OptionsSerializer(serializers.ModelSerializer):
+    primary_key_related_field = serializers.PrimaryKeyRelatedField(
+        queryset=Relation.objects.all(), label_field='name', options_threshold=3, allow_null=True
+    )
+    slug_related_field = serializers.SlugRelatedField(slug_field='name', queryset=Relation.objects.all(),
+                                                      allow_null=True)
+
+    class Meta:
+        model = AdvancedFields
+        fields = ('id', 'primary_key_related_field', 'slug_related_field')
+
+
+class OptionsViewSet(viewsets.ModelViewSet):
+    queryset = AdvancedFields.objects.all()
+    serializer_class = OptionsSerializer
+    permission_classes = (AllowAny,)
+
+
+class PrivateOptionsViewSet(OptionsViewSet):
+    permission_classes = (IsAuthenticated,)
+
+
+def options_url(view_class=OptionsViewSet):
+    context = dict(view=view_class()) if view_class else {}
+    return OptionsSerializer(context=context).fields['primary_key_related_field'].options_url
+
+
+@override_settings(ROOT_URLCONF='setup.urls')
+class RelatedOptionsTest(APITestCase):
+
+    def setUp(self):
+        caches[settings.COUNT_CACHE].clear()
+        Relation.objects.all().delete()
+        self.relations = [Relation.objects.create(name='Relation %02d' % i) for i in range(12)]
+
+    def test_large_select_renders_selected_option_only(self):
+        instance = AdvancedFields(primary_key_related_field=self.relations[5], slug_related_field=self.relations[1])
+        serializer = OptionsSerializer(instance)
+        html = HTMLFormRenderer().render(serializer.data, renderer_context={})
+        self.assertIn('ajax: {', html)
+        self.assertIn('Relation 05', html)
+        self.assertEqual(html.count('>Relation 07<'), 1)
+        # slug field is below default threshold: all options are rendered
+        self.assertEqual(html.count('value="Relation'), 12)
+
+    def test_small_select_renders_options_inline(self):
+        self.assertIsNone(OptionsSerializer().fields['slug_related_field'].options_url)
+        Relation.objects.filter(pk__in=[r.pk for r in self.relations[3:]]).delete()
+        self.assertIsNone(OptionsSerializer().fields['primary_key_related_field'].options_url)
+
+    def test_unsearchable_field_renders_options_inline(self):
+        field = serializers.PrimaryKeyRelatedField(queryset=Relation.objects.all(), options_threshold=3)
+        field.bind('relation', OptionsSerializer())
+        self.assertIsNone(field.options_url)
+
+    def test_option_count_is_cached(self):
+        self.assertIsNotNone(OptionsSerializer().fields['primary_key_related_field'].options_url)
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(OptionsSerializer().fields['primary_key_related_field'].options_url)
+        Relation.objects.filter(pk__in=[r.pk for r in self.relations[3:]]).delete()
+        self.assertIsNone(OptionsSerializer().fields['primary_key_related_field'].options_url)
+
+    def test_options_endpoint(self):
+        url = options_url()
+        response = self.client.get(url + '&term=relation+0')
+        self.assertEqual([r['text'] for r in response.data['results']], ['Relation %02d' % i for i in range(10)])
+        self.assertIsNone(response.data['cursor'])
+
+        response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), min(settings.OPTIONS_PAGE_SIZE, 12))
+
+    def test_options_paging(self):
+        field = OptionsSerializer().fields['primary_key_related_field']
+        results, cursor = field.options_page(page_size=5)
+        self.assertEqual([r['id'] for r in results], [r.pk for r in self.relations[:5]])
+        results, cursor = field.options_page(cursor=cursor, page_size=5)
+        self.assertEqual([r['text'] for r in results], ['Relation %02d' % i for i in range(5, 10)])
+        results, cursor = field.options_page(cursor=cursor, page_size=5)
+        self.assertEqual(len(results), 2)
+        self.assertIsNone(cursor)
+
+    def test_invalid_key(self):
+        url = options_url()
+        self.assertEqual(self.client.get(url.replace('field=', 'field=x')).status_code, 404)
+        key = signing.dumps(['examples.models.Relation', 'name', OptionsViewSet.__module__ + '.OptionsViewSet'],
+                            salt=RelatedOptionsMixin.signing_salt)
+        self.assertEqual(self.client.get(url.split('?')[0], dict(field=key)).status_code, 404)
+
+    def test_expired_key(self):
+        url = options_url()
+        with mock.patch.object(settings, 'OPTIONS_KEY_MAX_AGE', -1):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_viewset_permissions(self):
+        url = options_url(PrivateOptionsViewSet)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_authenticate(User.objects.create(username='options'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_authentication_required_without_viewset(self):
+        url = options_url(None)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_authenticate(User.objects.create(username='options'))
+        self.assertEqual(self.client.get(url).status_code, 200)
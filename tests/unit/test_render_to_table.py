@@ -0,0 +1,51 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import pytz
+from django.test import TestCase
+
+from dynamicforms import serializers
+from examples.models import BasicFields
+from examples.rest.basic_fields import BasicFieldsSerializer
+
+
+class UpperCharField(serializers.CharField):
+
+    def render_to_table(self, value, row_data):
+        return value.upper()
+
+
+class RenderToTableColumnTest(TestCase):
+
+    def assertSameAsRenderToTable(self, field, values):
+        rows = [{} for _ in values]
+        self.assertEqual(field.render_to_table_column(values, rows),
+                         [field.render_to_table(value, row) for value, row in zip(values, rows)])
+
+    def test_field_types(self):
+        self.assertSameAsRenderToTable(serializers.BooleanField(), [True, False, None, 1])
+        self.assertSameAsRenderToTable(serializers.IntegerField(), [1, None, 0, -5])
+        self.assertSameAsRenderToTable(serializers.DecimalField(max_digits=5, decimal_places=2),
+                                       ['1.50', Decimal('2.00'), None])
+        self.assertSameAsRenderToTable(serializers.DateTimeField(),
+                                       ['2018-01-01T10:00:00Z', datetime(2018, 1, 1, tzinfo=pytz.utc), None])
+        self.assertSameAsRenderToTable(serializers.DateField(), ['2018-01-01', date(2018, 1, 1), None])
+        self.assertSameAsRenderToTable(serializers.TimeField(), ['10:00:00', time(10), None])
+        self.assertSameAsRenderToTable(serializers.DurationField(), ['1 00:00:00', timedelta(days=1), None])
+        self.assertSameAsRenderToTable(serializers.CharField(),
+                                       ['text', 'http://example.com', 'me@example.com', 'a\nb', '<b>', None])
+        self.assertSameAsRenderToTable(serializers.ChoiceField(choices=((0, 'Zero'), (1, 'One'), ('x', True))),
+                                       [0, 1, 'x', 2, None])
+
+    def test_render_to_table_override(self):
+        field = UpperCharField()
+        self.assertEqual(field.render_to_table_column(['a', 'b'], [{}, {}]), ['A', 'B'])
+
+    def test_serializer_data(self):
+        BasicFields.objects.create(boolean_field=True, char_field='abc', integer_field=5, decimal_field='1.5',
+                                   datetime_field=datetime(2018, 1, 1, tzinfo=pytz.utc), date_field=date(2018, 1, 1))
+        BasicFields.objects.create()
+        data = BasicFieldsSerializer(BasicFields.objects.all(), many=True).data
+        for name, field in BasicFieldsSerializer().fields.items():
+            self.assertEqual(field.render_to_table_column([row[name] for row in data], data),
+                             [field.render_to_table(row[name], row) for row in data])
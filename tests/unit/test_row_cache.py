@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from dynamicforms.cache import RowCache, row_cache_stats
+from examples.models import PageLoad
+from examples.rest.page_load import PageLoadSerializer
+
+
+class RowCacheTest(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def get_rows(self):
+        return self.client.get(reverse('page-load-list', args=['html']), HTTP_X_DF_RENDER_TYPE='table rows').content
+
+    def test_rows_are_cached(self):
+        uncached = self.get_rows()
+        with mock.patch.object(PageLoadSerializer, 'use_row_renderer', True), \
+                mock.patch.object(PageLoadSerializer, 'row_cache', True):
+            stats = row_cache_stats(PageLoadSerializer)
+            self.assertEqual(self.get_rows(), uncached)
+            stats_first = row_cache_stats(PageLoadSerializer)
+            self.assertEqual(stats_first['hits'] - stats['hits'], 0)
+            self.assertEqual(stats_first['misses'] - stats['misses'], 30)
+
+            self.assertEqual(self.get_rows(), uncached)
+            stats_second = row_cache_stats(PageLoadSerializer)
+            self.assertEqual(stats_second['hits'] - stats_first['hits'], 30)
+            self.assertEqual(stats_second['misses'] - stats_first['misses'], 0)
+
+            record = PageLoad.objects.order_by('id').first()
+            record.description = 'Changed'
+            record.save()
+            content = self.get_rows().decode('utf-8')
+            stats_third = row_cache_stats(PageLoadSerializer)
+            self.assertEqual(stats_third['hits'] - stats_second['hits'], 29)
+            self.assertEqual(stats_third['misses'] - stats_second['misses'], 1)
+            self.assertIn('Changed', content)
+
+    def test_views_dont_share_rows(self):
+        record = PageLoad.objects.order_by('id').first()
+        first = RowCache(PageLoadSerializer, 'page-load:/page-load.html')
+        first.get_many([record.pk])
+        first.set_many({record.pk: '<td>page-load</td>'})
+        self.assertEqual(RowCache(PageLoadSerializer, 'page-load:/page-load.html').get_many([record.pk]),
+                         {record.pk: '<td>page-load</td>'})
+        self.assertEqual(RowCache(PageLoadSerializer, 'other-view:/other.html').get_many([record.pk]), {})
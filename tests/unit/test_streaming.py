@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from dynamicforms.renderers import TemplateHTMLRenderer
+from examples.models import Relation
+from examples.rest.relation import RelationViewset
+
+
+class StreamingListTest(APITestCase):
+
+    def setUp(self):
+        Relation.objects.all().delete()
+
+    def get(self, render_type):
+        response = self.client.get(reverse('relation-list', args=['html']), HTTP_X_DF_RENDER_TYPE=render_type)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['content-type'], 'text/html; charset=utf-8')
+        return response
+
+    def test_table_is_streamed(self):
+        Relation.objects.bulk_create(Relation(name='Relation %d' % i) for i in range(5))
+        with mock.patch.object(RelationViewset, 'streaming_chunk_size', 2):
+            response = self.get('table')
+            self.assertTrue(response.streaming)
+            chunks = [chunk.decode('utf-8') for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 5, 'Table head, three chunks of rows, table footer')
+        self.assertTrue(chunks[0].strip().startswith('<table id="list-'))
+        self.assertIn('<tbody>', chunks[0])
+        self.assertEqual([chunk.count('<tr data-id=') for chunk in chunks], [0, 2, 2, 1, 0])
+        self.assertIn('</tbody>', chunks[-1])
+        self.assertIn('dynamicforms.paginatorInitTable("%s"' % chunks[0].split('id="list-')[1].split('"')[0],
+                      chunks[-1])
+        self.assertNotIn('dynamicforms-stream-table-rows', ''.join(chunks))
+
+    def test_table_rows_empty(self):
+        response = self.get('table rows')
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertNotIn('<table', content)
+        self.assertIn('<tr data-title="NoData">', content)
+        self.assertIn('colspan="3"', content)
+
+    def test_page_is_not_streamed(self):
+        self.assertFalse(self.get('page').streaming)
+
+    def test_chunks_keep_prefetches(self):
+        Relation.objects.bulk_create(Relation(name='Relation %d' % i) for i in range(5))
+        queryset = Relation.objects.order_by('-name').prefetch_related('hyper_related')
+        with self.assertNumQueries(1 + 3 * 2):
+            chunks = list(TemplateHTMLRenderer.iterate_chunks(queryset, 2))
+            for chunk in chunks:
+                for record in chunk:
+                    list(record.hyper_related.all())
+        self.assertEqual([[r.name for r in chunk] for chunk in chunks],
+                         [['Relation 4', 'Relation 3'], ['Relation 2', 'Relation 1'], ['Relation 0']])
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.template import loader
+from django.test import TestCase
+
+from dynamicforms import serializers, settings
+from dynamicforms.mixins import _static_table_choices
+from dynamicforms.renderers import TemplateHTMLRenderer
+from examples.models import AdvancedFields, Relation
+
+
+class RelatedSerializer(serializers.ModelSerializer):
+    primary_key_related_field = serializers.PrimaryKeyRelatedField(queryset=Relation.objects.all())
+    slug_related_field = serializers.SlugRelatedField(slug_field='name', queryset=Relation.objects.all())
+
+    class Meta:
+        model = AdvancedFields
+        fields = ('id', 'primary_key_related_field', 'slug_related_field')
+
+
+class TableChoicesTest(TestCase):
+
+    def setUp(self):
+        Relation.objects.all().delete()
+        for i in range(6):
+            relation = Relation.objects.create(name='Relation %d' % i)
+            AdvancedFields.objects.create(regex_field='abcdef', primary_key_related_field=relation,
+                                          slug_related_field=relation)
+
+    @staticmethod
+    def serialize(queryset):
+        serializer = RelatedSerializer(queryset, many=True)
+        return serializer, serializer.data
+
+    def render_table(self, serializer, data):
+        serializer.child.render_type = 'table rows'
+        TemplateHTMLRenderer().prepare_table_choices(serializer.child, data)
+        return loader.get_template(settings.TEMPLATE + 'base_list.html').render(dict(
+            serializer=serializer.child, data=data, DF=settings.CONTEXT_VARS, url_reverse='advanced-fields'
+        ))
+
+    def test_related_labels_in_bulk(self):
+        for use_row_renderer in (False, True):
+            with mock.patch.object(RelatedSerializer, 'use_row_renderer', use_row_renderer):
+                # one query for each related field, regardless of number of rows
+                serializer, data = self.serialize(AdvancedFields.objects.all())
+                with self.assertNumQueries(2):
+                    content = self.render_table(serializer, data)
+                self.assertEqual(content.count('Relation 5'), 2)
+                serializer, data = self.serialize(AdvancedFields.objects.all()[:2])
+                with self.assertNumQueries(2):
+                    self.render_table(serializer, data)
+
+    def test_render_to_table(self):
+        relation = Relation.objects.first()
+        field = RelatedSerializer().fields['primary_key_related_field']
+        with self.assertNumQueries(1):
+            self.assertEqual(field.render_to_table(relation.pk, {}), relation.name)
+            self.assertEqual(field.render_to_table(relation.pk, {}), relation.name)
+        self.assertEqual(field.render_to_table(-1, {}), '-1')
+
+    def test_grouped_choices(self):
+        field = serializers.ChoiceField(choices=(('Odd', ((1, 'One'), (3, 'Three'))), (2, 'Two')))
+        self.assertEqual(field.render_to_table_column([1, 2, 3, 4], [{}] * 4), ['One', 'Two', 'Three', '4'])
+        self.assertIs(field.get_table_choices([]), serializers.ChoiceField(choices=(
+            ('Odd', ((1, 'One'), (3, 'Three'))), (2, 'Two'))).get_table_choices([]))
+
+    def test_static_choices_cache_is_bounded(self):
+        for i in range(_static_table_choices.cache_info().maxsize + 10):
+            field = serializers.ChoiceField(choices=[(i, 'Choice %d' % i)])
+            self.assertEqual(field.get_table_choices([i]), {i: 'Choice %d' % i})
+        info = _static_table_choices.cache_info()
+        self.assertEqual(info.currsize, info.maxsize)
+
+    def test_static_choices_indexed_once_per_field(self):
+        field = serializers.ChoiceField(choices=[(i, 'Choice %d' % i) for i in range(1000)])
+        field.render_to_table(1, {})
+        with mock.patch('dynamicforms.mixins._static_table_choices', side_effect=AssertionError('Index looked up')):
+            for i in range(10):
+                self.assertEqual(field.render_to_table(i, {}), 'Choice %d' % i)
+        field.choices = [(1, 'Replaced')]
+        self.assertEqual(field.render_to_table(1, {}), 'Replaced')
@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from dynamicforms import serializers, viewsets
+from dynamicforms.action import Action, ActionControls
+from examples.models import HiddenFields
+
+
+class ColumnsSerializer(serializers.ModelSerializer):
+    controls = ActionControls([
+        Action(label='Edit', title='', icon='', action='edit("{{ row.unit }}");', position='rowend'),
+    ])
+    cst_fld = serializers.CharField(visible_in_table=False)
+    additional_text = serializers.CharField(visible_in_table=False)
+    quantity = serializers.SerializerMethodField()
+
+    field_columns = dict(quantity=('int_fld',))
+
+    class Meta:
+        model = HiddenFields
+        fields = ('id', 'note', 'unit', 'cst_fld', 'additional_text', 'quantity')
+
+    # noinspection PyMethodMayBeStatic
+    def get_quantity(self, obj):
+        return obj.int_fld
+
+
+class ColumnsViewSet(viewsets.ModelViewSet):
+    queryset = HiddenFields.objects.all()
+    serializer_class = ColumnsSerializer
+    prune_table_columns = True
+
+
+class TableColumnsTest(APITestCase):
+
+    def setUp(self):
+        for i in range(3):
+            HiddenFields.objects.create(note='Note %d' % i, unit='pcs', int_fld=i, cst_fld='Comment', qty_fld=1.5,
+                                        additional_text='Text')
+
+    def get(self, fmt, render_type='table', viewset=ColumnsViewSet):
+        request = APIRequestFactory().get('/columns/', dict(format=fmt), HTTP_X_DF_RENDER_TYPE=render_type)
+        with CaptureQueriesContext(connection) as queries:
+            response = viewset.as_view({'get': 'list'})(request)
+            response.render()
+        return response, [q['sql'] for q in queries.captured_queries]
+
+    def test_layout_data_fields(self):
+        self.assertEqual(ColumnsSerializer().table_layout.data_fields, ('id', 'note', 'unit', 'quantity'))
+        self.assertEqual(ColumnsSerializer().table_query_plan.only, ('id', 'int_fld', 'note', 'unit'))
+
+    def test_table_loads_only_needed_columns(self):
+        response, queries = self.get('html')
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('cst_fld', queries[0])
+        self.assertNotIn('additional_text', queries[0])
+        self.assertIn('int_fld', queries[0])
+        content = response.content.decode('utf-8')
+        self.assertIn('edit("pcs");', content)
+        self.assertIn('Note 2', content)
+
+    def test_not_pruned_by_default(self):
+        self.assertFalse(viewsets.ModelViewSet.prune_table_columns)
+        viewset = type('UnprunedViewSet', (ColumnsViewSet,), dict(prune_table_columns=False))
+        response, queries = self.get('html', viewset=viewset)
+        self.assertIn('cst_fld', queries[0])
+
+    def test_json_is_not_pruned(self):
+        response, queries = self.get('json')
+        self.assertIn('cst_fld', queries[0])
+        self.assertEqual(response.data[0]['additional_text'], 'Text')
+
+    def test_form_is_not_pruned(self):
+        request = APIRequestFactory().get('/columns/', dict(format='html'), HTTP_X_DF_RENDER_TYPE='form')
+        instance = HiddenFields.objects.first()
+        response = ColumnsViewSet.as_view({'get': 'retrieve'})(request, pk=instance.pk)
+        self.assertEqual(response.data['cst_fld'], 'Comment')
+
+    def test_unknown_source_loads_all_columns(self):
+        serializer_class = type('UndeclaredColumnsSerializer', (ColumnsSerializer,), dict(field_columns={}))
+        self.assertEqual(serializer_class().table_query_plan.only, ())
@@ -0,0 +1,37 @@
+from unittest import mock
+
+from django.template.engine import Engine
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from examples.models import PageLoad
+
+
+class TableCommandsCacheTest(APITestCase):
+
+    def setUp(self):
+        PageLoad.objects.bulk_create(PageLoad(description='Item %d' % i) for i in range(30))
+
+    def render_page(self):
+        with mock.patch.object(Engine, 'from_string', autospec=True, side_effect=Engine.from_string) as from_string:
+            response = self.client.get(reverse('page-load-list', args=['html']), HTTP_X_DF_RENDER_TYPE='table')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content.decode('utf-8'), from_string.call_count
+
+    def test_compile_count_after_warmup(self):
+        # Benchmark: a 30 row page used to compile 2 + 30 * (2 + 2 * columns) templates on every render
+        content, _ = self.render_page()
+        content_cached, compiled = self.render_page()
+        self.assertEqual(compiled, 0, 'Table commands should not be compiled again once the cache is warm')
+        self.assertEqual(content.count('<tr data-id='), 30)
+        self.assertEqual(content_cached.count('dynamicforms.deleteRow('), 30)
+
+    def test_serializer_uuid_is_not_cached(self):
+        content1, _ = self.render_page()
+        content2, _ = self.render_page()
+        uuid1 = content1.split('id="list-')[1].split('"')[0]
+        uuid2 = content2.split('id="list-')[1].split('"')[0]
+        self.assertNotEqual(uuid1, uuid2)
+        self.assertIn("$('#list-%s').find('tbody').click(" % uuid1, content1)
+        self.assertIn("$('#list-%s').find('tbody').click(" % uuid2, content2)
@@ -0,0 +1,62 @@
+from django.test import TestCase
+
+from dynamicforms import serializers
+from dynamicforms.action import Action, ActionControls
+from dynamicforms.table import TableLayout
+from examples.models import Filter
+from examples.rest.filter import FilterSerializer
+
+
+class LayoutSerializer(serializers.ModelSerializer):
+    controls = ActionControls([
+        Action(label='Left', title='', icon='', action='left();', position='fieldleft', field_name='char_field'),
+        Action(label='Right', title='', icon='', action='right();', position='fieldright', field_name='int_field'),
+        Action(label='Start', title='', icon='', action='start();', position='rowstart'),
+    ])
+    bool_field = serializers.BooleanField(visible_in_table=False)
+    int_field = serializers.IntegerField(write_only=True)
+
+    class Meta:
+        model = Filter
+        exclude = ()
+
+
+class TableLayoutTest(TestCase):
+
+    def test_layout(self):
+        layout = LayoutSerializer().table_layout
+        self.assertEqual(layout.columns, ('id', 'char_field', 'datetime_field', 'int_choice_field'))
+        self.assertEqual(len(layout.headers), len(layout.columns))
+        self.assertEqual(layout.columns_count, 5, 'Four visible fields and rowstart column')
+        self.assertEqual([a.label for a in layout.position_actions('fieldleft')], ['Left'])
+        self.assertEqual([a.label for a in layout.position_actions('fieldleft', 'char_field')], ['Left'])
+        self.assertEqual(layout.position_actions('fieldleft', 'id'), ())
+        self.assertEqual(layout.position_actions('rowend'), ())
+
+    def test_layout_is_stored_on_class(self):
+        layout = FilterSerializer().table_layout
+        self.assertIsInstance(layout, TableLayout)
+        self.assertIs(FilterSerializer().table_layout, layout)
+        self.assertIsNot(LayoutSerializer().table_layout, layout)
+        self.assertEqual(layout.columns_count, len(layout.columns) + 1, 'Default crud only adds a rowend column')
+        with self.assertRaises(TypeError):
+            layout.actions['rowend'] = ()
+
+    def test_layout_is_stored_on_instance_without_cache_fields(self):
+        class ContextSerializer(LayoutSerializer):
+            cache_fields = False
+
+            def get_fields(self):
+                fields = super().get_fields()
+                if self.context.get('short'):
+                    fields.pop('char_field')
+                return fields
+
+        full = ContextSerializer()
+        short = ContextSerializer(context=dict(short=True))
+        self.assertIn('char_field', full.table_layout.columns)
+        self.assertNotIn('char_field', short.table_layout.columns)
+        self.assertNotIn('char_field', short.table_query_plan.only)
+        self.assertNotIn('_table_layout', ContextSerializer.__dict__)
+        self.assertNotIn('_table_query_plan', ContextSerializer.__dict__)
+        self.assertIs(short.table_layout, short.table_layout)
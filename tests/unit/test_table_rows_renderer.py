@@ -0,0 +1,66 @@
+from datetime import datetime
+from unittest import mock
+
+import pytz
+from django.template import loader
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from dynamicforms import serializers, settings
+from dynamicforms.action import Action, ActionControls
+from examples.models import Filter, PageLoad
+from examples.rest.page_load import PageLoadSerializer
+
+
+class ActionsSerializer(serializers.ModelSerializer):
+    controls = ActionControls([
+        Action(label='Left', title='', icon='', action='left({{ row.id }});', position='fieldleft',
+               field_name='char_field'),
+        Action(label='Right', title='', icon='/icon.png', action='right("{{ value }}");', position='fieldright',
+               field_name='int_choice_field'),
+        Action(label='Start', title='', icon='', action='start({{ row.id }});', position='rowstart'),
+        Action(label='End', title='', icon='', action='end({{ row.id }});', position='rowend'),
+    ])
+
+    class Meta:
+        model = Filter
+        exclude = ()
+
+
+class TableRowsRendererTest(APITestCase):
+
+    def render_list(self, serializer_class, queryset, render_type):
+        serializer = serializer_class(queryset, many=True)
+        data = serializer.data
+        serializer.child.render_type = render_type
+        return loader.get_template(settings.TEMPLATE + 'base_list.html').render(dict(
+            serializer=serializer.child, data=data, link_next='/next/?a=1&b=2', link_prev=None,
+            DF=settings.CONTEXT_VARS
+        ))
+
+    def assertSameOutput(self, serializer_class, queryset, render_type):
+        template_output = self.render_list(serializer_class, queryset, render_type)
+        with mock.patch.object(serializer_class, 'use_row_renderer', True):
+            renderer_output = self.render_list(serializer_class, queryset, render_type)
+            if queryset.exists():
+                self.assertIn('start(%d);' % queryset.first().id, renderer_output)
+        uuid = renderer_output.split('id="list-')[1].split('"')[0] if render_type == 'table' else None
+        if uuid:
+            template_output = template_output.replace(template_output.split('id="list-')[1].split('"')[0], uuid)
+        self.assertEqual(renderer_output, template_output)
+
+    def test_differential_actions(self):
+        for i in range(5):
+            Filter.objects.create(char_field='<b>%d</b> & "x"' % i, int_field=i, int_choice_field=i % 4,
+                                  bool_field=bool(i % 2), datetime_field=datetime(2018, 1, i + 1, tzinfo=pytz.utc))
+        self.assertSameOutput(ActionsSerializer, Filter.objects.all(), 'table rows')
+        self.assertSameOutput(ActionsSerializer, Filter.objects.all(), 'table')
+        self.assertSameOutput(ActionsSerializer, Filter.objects.none(), 'table rows')
+
+    def test_differential_page_load(self):
+        self.assertTrue(PageLoad.objects.exists())
+        url = reverse('page-load-list', args=['html'])
+        template_output = self.client.get(url, HTTP_X_DF_RENDER_TYPE='table rows').content
+        with mock.patch.object(PageLoadSerializer, 'use_row_renderer', True):
+            renderer_output = self.client.get(url, HTTP_X_DF_RENDER_TYPE='table rows').content
+        self.assertEqual(renderer_output, template_output)
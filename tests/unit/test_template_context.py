@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.core.cache import caches
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from dynamicforms import serializers, settings, viewsets
+from dynamicforms.cache import model_version
+from dynamicforms.renderers import TemplateHTMLRenderer
+from examples.models import PageLoad
+
+
+class ContextSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PageLoad
+        fields = ('id', 'description')
+
+
+class ContextViewSet(viewsets.ModelViewSet):
+    queryset = PageLoad.objects.all()
+    serializer_class = ContextSerializer
+    calls = 0
+
+    def template_context(self):
+        type(self).calls += 1
+        return dict(url_reverse='page-load', items=list(PageLoad.objects.values_list('description', flat=True)))
+
+
+class CachedContextViewSet(ContextViewSet):
+    template_context_models = (PageLoad,)
+
+
+class TemplateContextTest(APITestCase):
+
+    def setUp(self):
+        caches[settings.TEMPLATE_CONTEXT_CACHE].clear()
+        PageLoad.objects.all().delete()
+        PageLoad.objects.create(description='First')
+        ContextViewSet.calls = CachedContextViewSet.calls = 0
+
+    @staticmethod
+    def view(viewset):
+        view = viewset()
+        view.request = APIRequestFactory().get('/context/')
+        view.render_type = 'table'
+        return view
+
+    def test_once_per_request(self):
+        view, renderer = self.view(ContextViewSet), TemplateHTMLRenderer()
+        renderer.get_view_context(view)
+        self.assertEqual(renderer.get_view_context(view)['items'], ['First'])
+        self.assertEqual(ContextViewSet.calls, 1)
+        self.view(ContextViewSet).get_template_context()
+        self.assertEqual(ContextViewSet.calls, 2)
+
+    def test_cached_until_model_changes(self):
+        self.assertEqual(self.view(CachedContextViewSet).get_template_context()['items'], ['First'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.view(CachedContextViewSet).get_template_context()['items'], ['First'])
+        self.assertEqual(CachedContextViewSet.calls, 1)
+
+        PageLoad.objects.create(description='Second')
+        self.assertEqual(self.view(CachedContextViewSet).get_template_context()['items'], ['First', 'Second'])
+        self.assertEqual(CachedContextViewSet.calls, 2)
+
+    def test_static_context(self):
+        viewset = type('StaticContextViewSet', (ContextViewSet,), dict(template_context=dict(url_reverse='x')))
+        self.assertEqual(self.view(viewset).get_template_context(), dict(url_reverse='x'))
+
+    def test_version_lost_by_cache(self):
+        cache = caches[settings.TEMPLATE_CONTEXT_CACHE]
+        cache.clear()
+        # Entry evicted right after it was added: token that was added is still returned
+        with mock.patch.object(cache, 'get', return_value=None):
+            self.assertIsNotNone(model_version(PageLoad, settings.TEMPLATE_CONTEXT_CACHE))
+        # Version unavailable (e.g. evicted between add and get of another process): context isn't cached
+        with mock.patch('dynamicforms.cache.model_version', return_value=None):
+            self.view(CachedContextViewSet).get_template_context()
+            self.assertEqual(self.view(CachedContextViewSet).get_template_context()['items'], ['First'])
+        self.assertEqual(CachedContextViewSet.calls, 2)
@@ -0,0 +1,54 @@
+from datetime import datetime
+from unittest import mock
+
+import pytz
+from django.core.management import call_command
+from django.test import TestCase
+
+from dynamicforms import serializers
+from dynamicforms.filters import FilterPlan
+from examples.models import Filter
+
+
+class TextFilterSerializer(serializers.ModelSerializer):
+    text_filter = 'prefix'
+
+    class Meta:
+        model = Filter
+        exclude = ()
+
+
+class TextFiltersTest(TestCase):
+
+    def setUp(self):
+        Filter.objects.all().delete()
+        for i, text in enumerate(('Apple pie', 'Pineapple', 'apple', 'Banana "split"')):
+            Filter.objects.create(char_field=text, int_field=i, int_choice_field=0, bool_field=False,
+                                  datetime_field=datetime(2018, 1, 1, tzinfo=pytz.utc))
+
+    def filtered(self, value):
+        queryset, rejected = FilterPlan(Filter, TextFilterSerializer).apply(Filter.objects.all(),
+                                                                             [('char_field', value)])
+        return sorted(queryset.values_list('int_field', flat=True))
+
+    def test_strategies(self):
+        self.assertEqual(self.filtered('apple'), [0, 2])
+        with mock.patch.object(TextFilterSerializer, 'text_filters', {'char_field': 'exact'}):
+            self.assertEqual(self.filtered('apple'), [2])
+        with mock.patch.object(TextFilterSerializer, 'text_filter', 'icontains'):
+            self.assertEqual(self.filtered('apple'), [0, 1, 2])
+
+    @mock.patch.object(TextFilterSerializer, 'text_filter', 'fulltext')
+    def test_fulltext(self):
+        self.assertEqual(self.filtered('apple'), [0, 1, 2], 'Without index, icontains is used')
+
+        call_command('build_text_index', 'examples.Filter.char_field', stdout=mock.Mock())
+        self.assertEqual(self.filtered('APPLE'), [0, 1, 2])
+        self.assertEqual(self.filtered('"split'), [3])
+        self.assertEqual(self.filtered('ap'), [0, 1, 2], 'Short values fall back to icontains')
+
+        Filter.objects.filter(int_field=2).update(char_field='Cherry')
+        Filter.objects.filter(int_field=0).delete()
+        Filter.objects.create(char_field='Crabapple', int_field=4, int_choice_field=0, bool_field=False,
+                              datetime_field=datetime(2018, 1, 1, tzinfo=pytz.utc))
+        self.assertEqual(self.filtered('apple'), [1, 4], 'Index is kept up to date by triggers')
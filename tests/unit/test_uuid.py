@@ -0,0 +1,63 @@
+import re
+from unittest import mock
+from uuid import UUID
+
+from django.core.signals import request_started
+from django.test import TestCase
+
+from dynamicforms import settings
+from dynamicforms.renderers import HTMLFormRenderer
+from examples.models import Filter
+from examples.rest.filter import FilterSerializer
+
+
+class UUIDStrategyTest(TestCase):
+
+    def render(self, serializer):
+        return HTMLFormRenderer().render(serializer.data, renderer_context={})
+
+    def ids(self, html):
+        return re.findall(r'id="([^"]+)"', html)
+
+    def test_given_uuid(self):
+        uuid = UUID(int=1)
+        self.assertEqual(FilterSerializer(uuid=uuid).uuid, uuid)
+
+    def test_counter(self):
+        with mock.patch.object(settings, 'UUID_STRATEGY', 'counter'):
+            request_started.send(sender=None)
+            first, second = FilterSerializer().uuid, FilterSerializer().uuid
+            self.assertEqual(second.int, first.int + 1)
+
+            html = self.render(FilterSerializer(Filter(id=1)))
+            ids = self.ids(html)
+            self.assertTrue(ids)
+            self.assertEqual(len(ids), len(set(ids)))
+
+            request_started.send(sender=None)
+            self.assertNotEqual(FilterSerializer().uuid, first, 'Ids must not repeat in later requests')
+
+    def test_deterministic(self):
+        with mock.patch.object(settings, 'UUID_STRATEGY', 'deterministic'):
+            html = self.render(FilterSerializer(Filter(id=1)))
+            self.assertEqual(self.render(FilterSerializer(Filter(id=1))), html)
+            self.assertNotEqual(self.render(FilterSerializer(Filter(id=2))), html)
+
+            ids = self.ids(html)
+            self.assertTrue(ids)
+            self.assertEqual(len(ids), len(set(ids)))
+
+    def test_deterministic_filter_row_and_new_record(self):
+        with mock.patch.object(settings, 'UUID_STRATEGY', 'deterministic'):
+            filter_row = FilterSerializer().build_filter_data()
+            # Table page with its filter row and a "new record" dialog opened on it
+            ids = self.ids(self.render(filter_row)) + self.ids(self.render(FilterSerializer(Filter())))
+            self.assertTrue(ids)
+            self.assertEqual(len(ids), len(set(ids)))
+            self.assertNotEqual(filter_row.uuid, FilterSerializer(Filter.objects.none()).uuid)
+
+    def test_dotted_path(self):
+        with mock.patch.object(settings, 'UUID_STRATEGY', 'dynamicforms.mixins.counter_strategy'):
+            serializer = FilterSerializer()
+            uuid = serializer.uuid
+            self.assertEqual(serializer.fields['char_field'].uuid.int, uuid.int + 1)